@@ -0,0 +1,260 @@
+"""Benchmarks for the Leasing Tracker calculation and update paths.
+
+Runs offline against a bare Home Assistant core: the registries are loaded
+and the leases are set up as real config entries through the config entry
+manager, with the integration loaded from ``custom_components`` of a
+temporary config directory. No other integrations are configured, but the
+integration imports the recorder helpers, so besides ``homeassistant`` the
+recorder requirements (``sqlalchemy``, ``psutil-home-assistant``,
+``fnv-hash-fast``) must be installed, as in every Home Assistant install.
+
+    python benchmarks/bench_leasing_tracker.py           # compare with baseline
+    python benchmarks/bench_leasing_tracker.py --save    # record a new baseline
+
+Timings are compared with ``baseline.json`` next to this file; a result
+slower than the baseline by more than ``--tolerance`` fails the run. Commit
+the baseline together with changes to the hot path.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+import logging
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import MappingProxyType
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.bootstrap import async_load_base_functionality  # noqa: E402
+from homeassistant.config_entries import ConfigEntries, ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.leasing_tracker import sensor  # noqa: E402
+from custom_components.leasing_tracker.calculation import (  # noqa: E402
+    LeaseParameters,
+    calculate_dates,
+    calculate_values,
+)
+from custom_components.leasing_tracker.const import (  # noqa: E402
+    CONF_CURRENT_KM_ENTITY,
+    CONF_DISTANCE_UNIT,
+    CONF_END_DATE,
+    CONF_KM_PER_YEAR,
+    CONF_NAME,
+    CONF_START_DATE,
+    CONF_START_KM,
+    DOMAIN,
+    UNIT_KILOMETERS,
+)
+from custom_components.leasing_tracker.coordinator import (  # noqa: E402
+    start_of_today,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+FAN_OUT_SIZES = (1, 50, 500)
+SETUP_SIZE = 500
+# KM-Sensor, den sich alle Leasings der Fan-out-Messung teilen
+SHARED_ODOMETER = "sensor.odometer_shared"
+
+
+def make_entry(index: int, odometer: str | None = None) -> ConfigEntry:
+    """Return the config entry of a lease, by default with its own odometer."""
+    data = {
+        CONF_NAME: f"Lease {index}",
+        CONF_CURRENT_KM_ENTITY: odometer or f"sensor.odometer_{index}",
+        CONF_START_DATE: "2024-03-15",
+        CONF_END_DATE: "2027-03-14",
+        CONF_START_KM: 10,
+        CONF_KM_PER_YEAR: 15000,
+        CONF_DISTANCE_UNIT: UNIT_KILOMETERS,
+    }
+    return ConfigEntry(
+        data=data,
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        entry_id=f"bench_{index}",
+        minor_version=1,
+        options={},
+        source="user",
+        title=data[CONF_NAME],
+        unique_id=f"bench_{index}",
+        version=1,
+    )
+
+
+async def async_start_hass(config_dir: str) -> HomeAssistant:
+    """Return a bare Home Assistant core that finds the integration."""
+    (Path(config_dir) / "custom_components").symlink_to(ROOT / "custom_components")
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await async_load_base_functionality(hass)
+    return hass
+
+
+async def async_setup_entries(
+    hass: HomeAssistant, first: int, count: int, odometer: str | None = None
+) -> None:
+    """Set up leases through the config entry manager."""
+    for index in range(first, first + count):
+        entry = make_entry(index, odometer)
+        hass.states.async_set(entry.data[CONF_CURRENT_KM_ENTITY], "25000")
+        await hass.config_entries.async_add(entry)
+
+
+def async_odometer_change(
+    hass: HomeAssistant, entity_id: str
+) -> Callable[[], Awaitable[None]]:
+    """Return an action that raises the reading of an odometer by 1 km."""
+    reading = iter(range(25001, 10**9))
+
+    async def async_state_change() -> None:
+        hass.states.async_set(entity_id, str(next(reading)))
+        await hass.async_block_till_done()
+
+    return async_state_change
+
+
+async def async_timed(
+    action: Callable[[], Awaitable[Any]], repeat: int
+) -> float:
+    """Return the median duration of an async action in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await action()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def timed(action: Callable[[], Any], repeat: int) -> float:
+    """Return the mean duration of a cheap action in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - start) / repeat
+
+
+async def async_run() -> dict[str, float]:
+    """Run all benchmarks and return the results."""
+    results: dict[str, float] = {}
+
+    # Calculation
+    params = LeaseParameters.from_config(make_entry(0).data)
+    today = start_of_today()
+    dates = calculate_dates(params, today)
+    results["calculate_dates"] = timed(lambda: calculate_dates(params, today), 20000)
+    results["calculate_values"] = timed(
+        lambda: calculate_values(params, dates, 25000.0), 20000
+    )
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_hass(config_dir)
+        try:
+            # Setup
+            start = time.perf_counter()
+            await async_setup_entries(hass, 0, SETUP_SIZE)
+            results[f"setup_{SETUP_SIZE}_entries"] = time.perf_counter() - start
+            coordinator = hass.data[DOMAIN]["bench_0"]
+
+            # Nur das Erstellen der Sensoren (ohne Schreiben in die State Machine)
+            entries = hass.config_entries.async_entries(DOMAIN)
+
+            async def async_construct_entities() -> None:
+                entities: list[sensor.SensorEntity] = []
+                for entry in entries:
+                    await sensor.async_setup_entry(hass, entry, entities.extend)
+
+            results[f"entity_construction_{SETUP_SIZE}_entries"] = await async_timed(
+                async_construct_entities, 5
+            )
+            results["coordinator_calculate_values"] = timed(
+                coordinator._calculate_values, 20000
+            )
+
+            # Zustandsänderung eines KM-Sensors, den nur eines der Leasings nutzt
+            await hass.async_block_till_done()
+            results[
+                f"state_change_unrelated_{SETUP_SIZE}_entries"
+            ] = await async_timed(async_odometer_change(hass, "sensor.odometer_0"), 200)
+
+            # Speicher pro Eintrag
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            await async_setup_entries(hass, SETUP_SIZE, 100)
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            allocated = sum(
+                stat.size_diff for stat in after.compare_to(before, "filename")
+            )
+            results["memory_per_entry_bytes"] = allocated / 100
+        finally:
+            await hass.async_stop(force=True)
+
+    # Fan-out: eine Zustandsänderung erreicht alle Leasings des KM-Sensors
+    for size in FAN_OUT_SIZES:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = await async_start_hass(config_dir)
+            try:
+                await async_setup_entries(hass, 0, size, SHARED_ODOMETER)
+                await hass.async_block_till_done()
+                results[f"state_change_{size}_entries"] = await async_timed(
+                    async_odometer_change(hass, SHARED_ODOMETER), 200
+                )
+            finally:
+                await hass.async_stop(force=True)
+
+    return results
+
+
+def compare(results: dict[str, float], tolerance: float) -> bool:
+    """Print the results next to the baseline and return False on regressions."""
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    ok = True
+    for name, value in results.items():
+        if (reference := baseline.get(name)) is None:
+            print(f"{name:36} {value:14.6g}   (no baseline)")
+            continue
+        ratio = value / reference if reference else 1.0
+        regression = ratio > tolerance
+        ok = ok and not regression
+        marker = "  REGRESSION" if regression else ""
+        print(f"{name:36} {value:14.6g}   {ratio:6.2f}x baseline{marker}")
+    return ok
+
+
+def main() -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="record a new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="allowed slowdown factor against the baseline (default: 1.5)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = asyncio.run(async_run())
+
+    if args.save:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE}")
+        return 0
+    return 0 if compare(results, args.tolerance) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,13 +8,26 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import config_validation as cv, device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 
+from .backfill import HistoryBackfill
+from .const import (
+    CONF_ENTRY_TYPE,
+    CONF_NAME,
+    DATA_BACKFILL,
+    DATA_FLEET,
+    ENTRY_TYPE_FLEET,
+)
+from .coordinator import LeasingTrackerCoordinator, history_store
+from .fleet import LeasingFleet
+from .recorder_statistics import async_clear_statistics
+from .services import async_setup_services
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "leasing_tracker"
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.EVENT, Platform.SENSOR]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -22,13 +35,26 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Leasing Tracker component."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data[DATA_FLEET] = fleet = LeasingFleet(hass)
+    hass.data[DATA_BACKFILL] = HistoryBackfill(hass, fleet)
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Leasing Tracker from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        return True
+
+    coordinator = LeasingTrackerCoordinator(hass, entry)
+    await coordinator.async_config_entry_first_refresh()
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    entry.async_on_unload(hass.data[DATA_FLEET].async_add(coordinator))
+    if not coordinator.history_loaded:
+        entry.async_on_unload(hass.data[DATA_BACKFILL].async_request(coordinator))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -38,13 +64,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update options."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options, reloading only if the entities change."""
+    coordinator: LeasingTrackerCoordinator = hass.data[DOMAIN][entry.entry_id]
+    old_name = coordinator.config.get(CONF_NAME)
+    if not coordinator.async_update_config(entry.data):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    # Neuer Name nur am Gerät, die Sensornamen folgen automatisch
+    if entry.data.get(CONF_NAME) != old_name:
+        device_registry = dr.async_get(hass)
+        if device := device_registry.async_get_device(
+            identifiers={(DOMAIN, entry.entry_id)}
+        ):
+            device_registry.async_update_device(
+                device.id, name=entry.data[CONF_NAME]
+            )
+
+    # Gemeinsame Neuberechnung aller gleichzeitig geänderten Leasings
+    hass.data[DATA_FLEET].async_schedule_refresh(coordinator)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored odometer history and statistics of a config entry."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return
+    await history_store(hass, entry.entry_id).async_remove()
+    async_clear_statistics(hass, entry.entry_id)
@@ -0,0 +1,91 @@
+"""Incrementally maintained fleet totals for Leasing Tracker."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+import heapq
+from typing import Any
+
+from .const import STATUS_OPTIONS, UNIT_MILES
+
+KM_PER_MILE = 1.609344
+
+
+class FleetAggregates:
+    """Totals over all leases, updated from the old and new values of one lease.
+
+    Every lease contributes its remaining KM, its status and its KM
+    difference to plan. An update removes the old contribution of the lease
+    and adds the new one, so it never has to look at the other leases.
+
+    Remaining KM are summed per unit as integers to avoid rounding drift and
+    only converted to kilometers when read. The largest KM difference is
+    kept in a heap whose outdated entries are skipped when read.
+    """
+
+    __slots__ = ("_contributions", "_heap", "_remaining", "status_counts")
+
+    def __init__(self) -> None:
+        """Initialize the aggregates."""
+        self._contributions: dict[str, tuple[bool, int, str, float]] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._remaining = {False: 0, True: 0}
+        self.status_counts = dict.fromkeys(STATUS_OPTIONS, 0)
+
+    @property
+    def remaining_km_total(self) -> float:
+        """Return the remaining KM of all leases in kilometers."""
+        return self._remaining[False] + self._remaining[True] * KM_PER_MILE
+
+    @property
+    def worst_km_difference(self) -> tuple[float, str] | None:
+        """Return the largest KM difference to plan (in km) and its lease."""
+        heap = self._heap
+        while heap:
+            negative_difference, key = heap[0]
+            contribution = self._contributions.get(key)
+            if contribution is not None and contribution[3] == -negative_difference:
+                return -negative_difference, key
+            heapq.heappop(heap)
+        return None
+
+    def update(
+        self, key: str, values: Mapping[str, Any] | None, unit: str | None = None
+    ) -> bool:
+        """Replace the contribution of a lease; None removes it.
+
+        Returns True if the aggregates changed.
+        """
+        new = None
+        if values:
+            miles = unit == UNIT_MILES
+            difference = values["km_difference"]
+            new = (
+                miles,
+                values["remaining_km_total"],
+                values["status"],
+                difference * KM_PER_MILE if miles else float(difference),
+            )
+
+        old = self._contributions.get(key)
+        if new == old:
+            return False
+
+        if old is not None:
+            del self._contributions[key]
+            self._remaining[old[0]] -= old[1]
+            self.status_counts[old[2]] -= 1
+        if new is not None:
+            self._contributions[key] = new
+            self._remaining[new[0]] += new[1]
+            self.status_counts[new[2]] += 1
+            if old is None or old[3] != new[3]:
+                heapq.heappush(self._heap, (-new[3], key))
+
+        # Veraltete Einträge gelegentlich entfernen
+        if len(self._heap) > 2 * len(self._contributions) + 16:
+            self._heap = [
+                (-contribution[3], contribution_key)
+                for contribution_key, contribution in self._contributions.items()
+            ]
+            heapq.heapify(self._heap)
+        return True
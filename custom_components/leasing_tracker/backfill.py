@@ -0,0 +1,113 @@
+"""Seed the odometer history from the recorder statistics."""
+from __future__ import annotations
+
+from datetime import date, datetime
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util import dt as dt_util
+
+from .recorder_statistics import async_publish_statistics
+
+if TYPE_CHECKING:
+    from .coordinator import LeasingTrackerCoordinator
+    from .fleet import LeasingFleet
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wartezeit, um nachträglich hinzugefügte Einträge zu sammeln
+BACKFILL_DELAY = 5
+
+
+class HistoryBackfill:
+    """Seed the odometer history of many entries with a single statistics query.
+
+    Entries without a stored history register here during setup. The
+    requests are collected until Home Assistant has started (or for a few
+    seconds at runtime) and then served by one ``statistics_during_period``
+    call in the recorder executor for all current KM entities. Afterwards
+    the affected leases are recalculated as one batch.
+    """
+
+    def __init__(self, hass: HomeAssistant, fleet: LeasingFleet) -> None:
+        """Initialize the backfill."""
+        self.hass = hass
+        self._fleet = fleet
+        self._pending: set[LeasingTrackerCoordinator] = set()
+        self._scheduled = False
+
+    @callback
+    def async_request(self, coordinator: LeasingTrackerCoordinator) -> CALLBACK_TYPE:
+        """Queue a coordinator for the next backfill."""
+        self._pending.add(coordinator)
+
+        if not self._scheduled:
+            self._scheduled = True
+            if self.hass.is_running:
+                async_call_later(self.hass, BACKFILL_DELAY, self._async_run)
+            else:
+                async_at_started(self.hass, self._async_run)
+
+        @callback
+        def async_cancel() -> None:
+            """Remove the coordinator from the queue."""
+            self._pending.discard(coordinator)
+
+        return async_cancel
+
+    async def _async_run(self, *_: Any) -> None:
+        """Run one statistics query for all queued coordinators."""
+        self._scheduled = False
+        pending = self._pending
+        self._pending = set()
+        if not pending or "recorder" not in self.hass.config.components:
+            return
+
+        statistic_ids = {coordinator.current_km_entity for coordinator in pending}
+        start_time = dt_util.start_of_local_day(
+            min(coordinator.backfill_start for coordinator in pending)
+        )
+        stats = await get_instance(self.hass).async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            start_time,
+            None,
+            statistic_ids,
+            "day",
+            None,
+            {"max", "state"},
+        )
+        _LOGGER.debug(
+            "Backfilled %s entries from %s statistics", len(pending), len(stats)
+        )
+
+        changed = [
+            coordinator
+            for coordinator in pending
+            if (rows := stats.get(coordinator.current_km_entity))
+            and coordinator.async_seed_history(_daily_readings(rows))
+        ]
+        if changed:
+            self._fleet.async_refresh(changed)
+            async_publish_statistics(self.hass, changed)
+
+
+def _daily_readings(rows: list[dict[str, Any]]) -> list[tuple[date, float]]:
+    """Return the closing reading per day from daily statistics rows."""
+    readings = []
+    for row in rows:
+        km = row.get("max")
+        if km is None:
+            km = row.get("state")
+        if km is None:
+            continue
+        start = row["start"]
+        if not isinstance(start, datetime):
+            start = dt_util.utc_from_timestamp(start)
+        readings.append((dt_util.as_local(start).date(), km))
+    return readings
@@ -0,0 +1,253 @@
+"""Batch calculation of many leases for Leasing Tracker.
+
+``calculate_batch`` returns the same values as ``calculate_values`` for a
+list of leases. If NumPy is available the arithmetic runs on column arrays
+for all leases at once, otherwise every lease is calculated on its own.
+
+Like ``calculation``, the module can be used without Home Assistant, e.g.
+for nightly reports, with the integration directory on the path::
+
+    sys.path.append("custom_components/leasing_tracker")
+    from batch import calculate_batch
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+try:
+    from .calculation import (
+        DAYS_PER_MONTH,
+        DAYS_PER_YEAR,
+        LeaseParameters,
+        calculate_dates,
+        calculate_values,
+    )
+except ImportError:
+    # Eigenständig importiert (Integrationsverzeichnis im Pfad)
+    from calculation import (  # type: ignore[no-redef]
+        DAYS_PER_MONTH,
+        DAYS_PER_YEAR,
+        LeaseParameters,
+        calculate_dates,
+        calculate_values,
+    )
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def calculate_batch(
+    leases: Sequence[LeaseParameters],
+    today: datetime,
+    current_km: Sequence[float],
+    km_at_year_start: Sequence[float | None],
+    km_at_month_start: Sequence[float | None],
+) -> list[dict[str, Any]]:
+    """Calculate all leasing values for many leases on the same day."""
+    if np is None or not leases:
+        return [
+            calculate_values(
+                params, calculate_dates(params, today), km, year_km, month_km
+            )
+            for params, km, year_km, month_km in zip(
+                leases, current_km, km_at_year_start, km_at_month_start
+            )
+        ]
+    return _calculate_batch_numpy(
+        leases, today, current_km, km_at_year_start, km_at_month_start
+    )
+
+
+def _calculate_batch_numpy(
+    leases: Sequence[LeaseParameters],
+    today: datetime,
+    current_km: Sequence[float],
+    km_at_year_start: Sequence[float | None],
+    km_at_month_start: Sequence[float | None],
+) -> list[dict[str, Any]]:
+    """Calculate the leasing values on column arrays.
+
+    Every step mirrors ``calculate_dates`` and ``calculate_values`` so the
+    results are identical, including the truncation of ``int()``. Only
+    ``round()`` is applied per lease while building the result, because
+    ``numpy.round`` does not round exactly like Python.
+    """
+    # Spalten
+    start = np.array([params.start_date.toordinal() for params in leases])
+    end = np.array([params.end_date.toordinal() for params in leases])
+    start_km = np.array([params.start_km for params in leases], dtype=float)
+    km_per_year = np.array([params.km_per_year for params in leases], dtype=float)
+    km = np.array(current_km, dtype=float)
+    year_km = np.array(
+        [np.nan if value is None else value for value in km_at_year_start]
+    )
+    month_km = np.array(
+        [np.nan if value is None else value for value in km_at_month_start]
+    )
+
+    # Datumswerte (für alle Leasings gleich)
+    today_ord = today.toordinal()
+    month_start_ord = datetime(today.year, today.month, 1).toordinal()
+    if today.month < 12:
+        next_month_ord = datetime(today.year, today.month + 1, 1).toordinal()
+    else:
+        next_month_ord = datetime(today.year + 1, 1, 1).toordinal()
+    days_in_month = next_month_ord - month_start_ord
+
+    # Zeitberechnungen
+    total_days = end - start
+    days_passed = today_ord - start
+    remaining_days = end - today_ord
+    months_passed = days_passed / DAYS_PER_MONTH
+    remaining_months = remaining_days / DAYS_PER_MONTH
+    total_years = total_days / DAYS_PER_YEAR
+
+    # KM Berechnungen
+    allowed_km_total = np.trunc(km_per_year * total_years)
+    allowed_km_per_month = np.trunc(km_per_year / 12)
+    should_have_driven = np.trunc((allowed_km_total / total_days) * days_passed)
+
+    # Jahr
+    year_start = np.maximum(start, datetime(today.year, 1, 1).toordinal())
+    year_end = np.minimum(end, datetime(today.year, 12, 31).toordinal())
+    days_in_current_year = year_end - year_start + 1
+    allowed_km_this_year = np.trunc((km_per_year / DAYS_PER_YEAR) * days_in_current_year)
+    days_from_start_to_year_start = np.maximum(0, year_start - start)
+    days_passed_this_year = today_ord - year_start
+    days_remaining_this_year = year_end - today_ord
+
+    # Monat
+    allowed_km_this_month = np.trunc((km_per_year / DAYS_PER_YEAR) * days_in_month)
+    days_from_start_to_month_start = np.maximum(0, month_start_ord - start)
+    days_passed_this_month = today_ord - month_start_ord
+    days_remaining_this_month = next_month_ord - today_ord
+
+    # Gefahrene KM und Durchschnitt
+    total_km_driven = np.trunc(km - start_km)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        day_ratio = total_km_driven / days_passed
+        month_ratio = total_km_driven / months_passed
+        progress = (days_passed / total_days) * 100
+        # Schätzungen aus dem Durchschnitt, nur gültig für days_passed > 0
+        year_estimated = start_km + (day_ratio * days_from_start_to_year_start)
+        month_estimated = start_km + (day_ratio * days_from_start_to_month_start)
+    km_per_day_average = np.array(
+        [
+            round(value, 2) if passed > 0 else 0
+            for value, passed in zip(day_ratio.tolist(), days_passed.tolist())
+        ],
+        dtype=float,
+    )
+    km_difference = total_km_driven - should_have_driven
+    remaining_km_total = np.maximum(0, allowed_km_total - total_km_driven)
+
+    # KM-Stand zu Jahresbeginn
+    km_at_year = np.where(
+        (days_from_start_to_year_start > 0) & (days_passed > 0),
+        np.where(np.isnan(year_km), year_estimated, year_km),
+        start_km,
+    )
+    km_driven_this_year = np.trunc(km - km_at_year)
+    remaining_km_year_actual = allowed_km_this_year - km_driven_this_year
+    year_estimate = (days_passed_this_year > 0) & (km_per_day_average > 0)
+    estimated_km_year_end = np.where(
+        year_estimate,
+        np.trunc(km_driven_this_year + (km_per_day_average * days_remaining_this_year)),
+        km_driven_this_year,
+    )
+    remaining_km_year = np.where(
+        year_estimate,
+        allowed_km_this_year - estimated_km_year_end,
+        allowed_km_this_year,
+    )
+
+    # KM-Stand zu Monatsbeginn
+    km_at_month = np.where(
+        (days_from_start_to_month_start > 0) & (days_passed > 0),
+        np.where(np.isnan(month_km), month_estimated, month_km),
+        np.where(month_start_ord <= start, start_km, km),
+    )
+    km_driven_this_month = np.trunc(km - km_at_month)
+    remaining_km_month_actual = allowed_km_this_month - km_driven_this_month
+    month_estimate = (days_passed_this_month > 0) & (km_per_day_average > 0)
+    estimated_km_month_end = np.where(
+        month_estimate,
+        np.trunc(km_driven_this_month + (km_per_day_average * days_remaining_this_month)),
+        km_driven_this_month,
+    )
+    remaining_km_month = np.where(
+        month_estimate,
+        allowed_km_this_month - estimated_km_month_end,
+        allowed_km_this_month,
+    )
+
+    # Status
+    status = np.select(
+        [
+            km_difference > allowed_km_per_month,
+            km_difference > 0,
+            km_difference > -allowed_km_per_month,
+        ],
+        ["far_above_plan", "above_plan", "on_track"],
+        "below_plan",
+    )
+
+    def ints(values: Any) -> list[int]:
+        return values.astype(np.int64).tolist()
+
+    columns = {
+        "allowed_km_total": ints(allowed_km_total),
+        "allowed_km_per_month": ints(allowed_km_per_month),
+        "allowed_km_this_year": ints(allowed_km_this_year),
+        "allowed_km_this_month": ints(allowed_km_this_month),
+        "remaining_days": ints(np.maximum(0, remaining_days)),
+        "days_total": ints(total_days),
+        "remaining_km_total": ints(remaining_km_total),
+        "total_km_driven": ints(total_km_driven),
+        "remaining_km_year": ints(remaining_km_year),
+        "estimated_km_year_end": ints(estimated_km_year_end),
+        "remaining_km_year_actual": ints(remaining_km_year_actual),
+        "km_driven_this_year": ints(km_driven_this_year),
+        "remaining_km_month": ints(remaining_km_month),
+        "estimated_km_month_end": ints(estimated_km_month_end),
+        "remaining_km_month_actual": ints(remaining_km_month_actual),
+        "km_driven_this_month": ints(km_driven_this_month),
+        "km_difference": ints(km_difference),
+        "status": status.tolist(),
+    }
+    keys = list(columns)
+    rows = zip(
+        *columns.values(),
+        remaining_months.tolist(),
+        progress.tolist(),
+        month_ratio.tolist(),
+        km_per_day_average.tolist(),
+        days_passed.tolist(),
+        months_passed.tolist(),
+        total_days.tolist(),
+    )
+
+    results = []
+    for row in rows:
+        values = dict(zip(keys, row))
+        (
+            remaining,
+            progress_value,
+            month_value,
+            day_average,
+            passed,
+            passed_months,
+            total,
+        ) = row[len(keys) :]
+        values["remaining_months"] = round(remaining, 1)
+        values["progress_percentage"] = round(progress_value, 1) if total > 0 else 0
+        values["km_per_day_average"] = day_average if passed > 0 else 0
+        values["km_per_month_average"] = (
+            round(month_value, 2) if passed_months > 0 else 0
+        )
+        results.append(values)
+    return results
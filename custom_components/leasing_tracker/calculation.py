@@ -0,0 +1,296 @@
+"""Calculation engine for Leasing Tracker.
+
+The calculation is split into two stages:
+
+* ``calculate_dates`` derives everything that only depends on the contract
+  and the current day. It is computed once per day.
+* ``calculate_values`` adds the current KM reading on top of that and runs
+  on every new reading, so it only does a handful of operations.
+
+``calculate`` runs both stages for a single reading.
+
+The module only uses the standard library and has no imports from the
+integration, so it can be used without Home Assistant by putting the
+integration directory on the path (``batch`` can be imported the same way)::
+
+    sys.path.append("custom_components/leasing_tracker")
+    from calculation import LeaseParameters, calculate
+
+All other modules of the integration need Home Assistant.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+DAYS_PER_MONTH = 30.44  # Durchschnittliche Tage pro Monat
+DAYS_PER_YEAR = 365.25
+
+
+@dataclass(frozen=True, slots=True)
+class LeaseParameters:
+    """Static parameters of a leasing contract."""
+
+    start_date: datetime
+    end_date: datetime
+    start_km: int
+    km_per_year: int
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> LeaseParameters:
+        """Create the parameters from a config entry or a row with the same keys.
+
+        Dates may be given as ISO strings, dates or datetimes.
+        """
+        return cls(
+            start_date=_as_datetime(config["start_date"]),
+            end_date=_as_datetime(config["end_date"]),
+            start_km=config["start_km"],
+            km_per_year=config["km_per_year"],
+        )
+
+
+def _as_datetime(value: str | date) -> datetime:
+    """Return a date of the contract as datetime at midnight."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+@dataclass(frozen=True, slots=True)
+class LeaseDates:
+    """Values derived from the contract and the current day."""
+
+    today: datetime
+    days_passed: int
+    months_passed: float
+    allowed_km_total: int
+    allowed_km_per_month: int
+    should_have_driven: int
+    allowed_km_this_year: int
+    days_from_start_to_year_start: int
+    days_passed_this_year: int
+    days_remaining_this_year: int
+    allowed_km_this_month: int
+    days_from_start_to_month_start: int
+    month_starts_before_lease: bool
+    days_passed_this_month: int
+    days_remaining_this_month: int
+    # Werte, die nicht vom KM-Stand abhängen
+    static_values: dict[str, Any]
+
+
+def calculate_dates(params: LeaseParameters, today: datetime) -> LeaseDates:
+    """Calculate all values that do not depend on the current KM reading."""
+    start_date = params.start_date
+    end_date = params.end_date
+    km_per_year = params.km_per_year
+
+    # Zeitberechnungen
+    total_days = (end_date - start_date).days
+    days_passed = (today - start_date).days
+    remaining_days = (end_date - today).days
+
+    # Monatliche Berechnungen
+    months_passed = days_passed / DAYS_PER_MONTH
+    remaining_months = remaining_days / DAYS_PER_MONTH
+
+    # Jahre Berechnungen
+    total_years = total_days / DAYS_PER_YEAR
+
+    # KM Berechnungen
+    allowed_km_total = int(km_per_year * total_years)
+    allowed_km_per_month = int(km_per_year / 12)
+
+    # Sollwert KM basierend auf verstrichener Zeit
+    should_have_driven = int((allowed_km_total / total_days) * days_passed)
+
+    # Jahr (aktuelles Kalenderjahr)
+    current_year_start = datetime(today.year, 1, 1)
+    if start_date > current_year_start:
+        current_year_start = start_date
+
+    current_year_end = datetime(today.year, 12, 31)
+    if end_date < current_year_end:
+        current_year_end = end_date
+
+    days_in_current_year = (current_year_end - current_year_start).days + 1
+    allowed_km_this_year = int((km_per_year / DAYS_PER_YEAR) * days_in_current_year)
+
+    # Monat (aktueller Monat)
+    current_month_start = datetime(today.year, today.month, 1)
+    if today.month < 12:
+        next_month_start = datetime(today.year, today.month + 1, 1)
+    else:
+        next_month_start = datetime(today.year + 1, 1, 1)
+
+    days_in_month = (next_month_start - current_month_start).days
+
+    # Erlaubte KM für diesen spezifischen Monat
+    # Berechne basierend auf dem durchschnittlichen Tagesbudget
+    daily_km_budget = km_per_year / DAYS_PER_YEAR
+    allowed_km_this_month = int(daily_km_budget * days_in_month)
+
+    # Fortschritt in Prozent
+    progress_percentage = round((days_passed / total_days) * 100, 1) if total_days > 0 else 0
+
+    return LeaseDates(
+        today=today,
+        days_passed=days_passed,
+        months_passed=months_passed,
+        allowed_km_total=allowed_km_total,
+        allowed_km_per_month=allowed_km_per_month,
+        should_have_driven=should_have_driven,
+        allowed_km_this_year=allowed_km_this_year,
+        days_from_start_to_year_start=max(0, (current_year_start - start_date).days),
+        days_passed_this_year=(today - current_year_start).days,
+        days_remaining_this_year=(current_year_end - today).days,
+        allowed_km_this_month=allowed_km_this_month,
+        days_from_start_to_month_start=max(0, (current_month_start - start_date).days),
+        month_starts_before_lease=current_month_start <= start_date,
+        days_passed_this_month=(today - current_month_start).days,
+        days_remaining_this_month=(next_month_start - today).days,
+        static_values={
+            "allowed_km_total": allowed_km_total,
+            "allowed_km_per_month": allowed_km_per_month,
+            "allowed_km_this_year": allowed_km_this_year,
+            "allowed_km_this_month": allowed_km_this_month,
+            "remaining_days": max(0, remaining_days),
+            "remaining_months": round(remaining_months, 1),
+            "days_total": total_days,
+            "progress_percentage": progress_percentage,
+        },
+    )
+
+
+def calculate_values(
+    params: LeaseParameters,
+    dates: LeaseDates,
+    current_km: float,
+    km_at_year_start: float | None = None,
+    km_at_month_start: float | None = None,
+) -> dict[str, Any]:
+    """Calculate all leasing values for a KM reading.
+
+    The KM readings at the start of the current year and month are taken
+    from the odometer history if known, otherwise they are estimated from
+    the average since the start of the lease.
+    """
+    start_km = params.start_km
+    days_passed = dates.days_passed
+
+    total_km_driven = int(current_km - start_km)
+
+    # Durchschnittswerte
+    km_per_day_average = (
+        round(total_km_driven / days_passed, 2) if days_passed > 0 else 0
+    )
+    km_per_month_average = (
+        round(total_km_driven / dates.months_passed, 2)
+        if dates.months_passed > 0
+        else 0
+    )
+
+    km_difference = total_km_driven - dates.should_have_driven
+
+    # Verbleibende KM gesamt
+    remaining_km_total = dates.allowed_km_total - total_km_driven
+
+    # Berechne den KM-Stand zu Jahresbeginn
+    # Ohne Verlauf nehmen wir an, dass der durchschnittliche Verbrauch konstant war
+    if dates.days_from_start_to_year_start > 0 and days_passed > 0:
+        if km_at_year_start is None:
+            km_at_year_start = start_km + (
+                total_km_driven / days_passed * dates.days_from_start_to_year_start
+            )
+    else:
+        km_at_year_start = start_km
+
+    km_driven_this_year = int(current_km - km_at_year_start)
+    remaining_km_year_actual = dates.allowed_km_this_year - km_driven_this_year
+
+    # Geschätzte KM am Jahresende (basierend auf Durchschnitt)
+    if dates.days_passed_this_year > 0 and km_per_day_average > 0:
+        estimated_km_year_end = int(
+            km_driven_this_year + (km_per_day_average * dates.days_remaining_this_year)
+        )
+        remaining_km_year_estimated = dates.allowed_km_this_year - estimated_km_year_end
+    else:
+        estimated_km_year_end = km_driven_this_year
+        remaining_km_year_estimated = dates.allowed_km_this_year
+
+    # Berechne den KM-Stand zu Monatsbeginn
+    if dates.days_from_start_to_month_start > 0 and days_passed > 0:
+        if km_at_month_start is None:
+            km_at_month_start = start_km + (
+                total_km_driven / days_passed * dates.days_from_start_to_month_start
+            )
+    else:
+        km_at_month_start = start_km if dates.month_starts_before_lease else current_km
+
+    km_driven_this_month = int(current_km - km_at_month_start)
+    remaining_km_month_actual = dates.allowed_km_this_month - km_driven_this_month
+
+    # Geschätzte KM am Monatsende (basierend auf Durchschnitt)
+    if dates.days_passed_this_month > 0 and km_per_day_average > 0:
+        estimated_km_month_end = int(
+            km_driven_this_month + (km_per_day_average * dates.days_remaining_this_month)
+        )
+        remaining_km_month_estimated = dates.allowed_km_this_month - estimated_km_month_end
+    else:
+        estimated_km_month_end = km_driven_this_month
+        remaining_km_month_estimated = dates.allowed_km_this_month
+
+    # Status ermitteln
+    allowed_km_per_month = dates.allowed_km_per_month
+    if km_difference > allowed_km_per_month:
+        status = "far_above_plan"
+    elif km_difference > 0:
+        status = "above_plan"
+    elif km_difference > -allowed_km_per_month:
+        status = "on_track"
+    else:
+        status = "below_plan"
+
+    return {
+        **dates.static_values,
+        # Gesamt
+        "remaining_km_total": max(0, remaining_km_total),
+        "total_km_driven": total_km_driven,
+        # Jahr
+        "remaining_km_year": remaining_km_year_estimated,
+        "estimated_km_year_end": estimated_km_year_end,
+        "remaining_km_year_actual": remaining_km_year_actual,
+        "km_driven_this_year": km_driven_this_year,
+        # Monat
+        "remaining_km_month": remaining_km_month_estimated,
+        "estimated_km_month_end": estimated_km_month_end,
+        "remaining_km_month_actual": remaining_km_month_actual,
+        "km_driven_this_month": km_driven_this_month,
+        # Durchschnitt & Status
+        "km_per_day_average": km_per_day_average,
+        "km_per_month_average": km_per_month_average,
+        "km_difference": km_difference,
+        "status": status,
+    }
+
+
+def calculate(
+    params: LeaseParameters,
+    today: datetime,
+    current_km: float,
+    km_at_year_start: float | None = None,
+    km_at_month_start: float | None = None,
+) -> dict[str, Any]:
+    """Calculate all leasing values for a KM reading on a day."""
+    return calculate_values(
+        params,
+        calculate_dates(params, today),
+        current_km,
+        km_at_year_start,
+        km_at_month_start,
+    )
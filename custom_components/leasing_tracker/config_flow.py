@@ -7,26 +7,90 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
+from homeassistant.helpers.storage import Store
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
     CONF_CURRENT_KM_ENTITY,
     CONF_DISTANCE_UNIT,
     CONF_END_DATE,
+    CONF_ENTRY_TYPE,
+    CONF_EVENT_HYSTERESIS,
+    CONF_FORECAST_MODE,
+    CONF_KM_DIFFERENCE_THRESHOLD,
     CONF_KM_PER_YEAR,
+    CONF_MIN_KM_DELTA,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_MONTH_BUDGET_THRESHOLD,
     CONF_NAME,
+    CONF_SAVE_DEFAULT_SENSOR_GROUPS,
+    CONF_SENSOR_GROUPS,
     CONF_START_DATE,
     CONF_START_KM,
+    DEFAULT_EVENT_HYSTERESIS,
+    DEFAULT_FORECAST_MODE,
+    DEFAULT_MIN_KM_DELTA,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_SENSOR_GROUPS,
     DOMAIN,
+    ENTRY_TYPE_FLEET,
+    ENTRY_TYPE_LEASE,
+    FORECAST_MODES,
+    SENSOR_GROUPS,
+    STORAGE_KEY_DEFAULTS,
+    STORAGE_VERSION,
     UNIT_KILOMETERS,
     UNIT_MILES,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+SENSOR_GROUPS_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=SENSOR_GROUPS,
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_SENSOR_GROUPS,
+    )
+)
+
+FORECAST_MODE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=FORECAST_MODES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_FORECAST_MODE,
+    )
+)
+
+
+def lease_unique_id(name: str) -> str:
+    """Return the unique ID of a lease."""
+    return f"leasing_{name.lower().replace(' ', '_')}"
+
+
+def _defaults_store(hass: HomeAssistant) -> Store[dict[str, Any]]:
+    """Return the store of the defaults for new leases."""
+    return Store(hass, STORAGE_VERSION, STORAGE_KEY_DEFAULTS)
+
+
+async def async_default_sensor_groups(hass: HomeAssistant) -> list[str]:
+    """Return the sensor groups preselected for new leases."""
+    data = await _defaults_store(hass).async_load() or {}
+    return list(data.get(CONF_SENSOR_GROUPS, DEFAULT_SENSOR_GROUPS))
+
+
+async def _async_save_sensor_groups(
+    hass: HomeAssistant, user_input: dict[str, Any]
+) -> None:
+    """Save the sensor groups of a lease as default if requested."""
+    if user_input.pop(CONF_SAVE_DEFAULT_SENSOR_GROUPS, False):
+        await _defaults_store(hass).async_save(
+            {CONF_SENSOR_GROUPS: list(user_input[CONF_SENSOR_GROUPS])}
+        )
+
 
 class LeasingTrackerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Leasing Tracker."""
@@ -37,6 +101,34 @@ class LeasingTrackerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(
+            step_id="user", menu_options=[ENTRY_TYPE_LEASE, ENTRY_TYPE_FLEET]
+        )
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up the fleet device with sensors over all leases."""
+        await self.async_set_unique_id(ENTRY_TYPE_FLEET)
+        self._abort_if_unique_id_configured()
+
+        if user_input is not None:
+            return self.async_create_entry(
+                title=user_input[CONF_NAME],
+                data={**user_input, CONF_ENTRY_TYPE: ENTRY_TYPE_FLEET},
+            )
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_NAME, default="Leasing Fleet"): cv.string}
+            ),
+        )
+
+    async def async_step_lease(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up a leasing contract."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -45,12 +137,15 @@ class LeasingTrackerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Prüfe ob das End-Datum nach dem Start-Datum liegt
                 if user_input[CONF_END_DATE] <= user_input[CONF_START_DATE]:
                     errors["base"] = "end_before_start"
+                elif not user_input[CONF_SENSOR_GROUPS]:
+                    errors["base"] = "no_sensor_groups"
                 else:
                     # Erstelle eindeutige ID
                     await self.async_set_unique_id(
-                        f"leasing_{user_input[CONF_NAME].lower().replace(' ', '_')}"
+                        lease_unique_id(user_input[CONF_NAME])
                     )
                     self._abort_if_unique_id_configured()
+                    await _async_save_sensor_groups(self.hass, user_input)
 
                     return self.async_create_entry(
                         title=user_input[CONF_NAME],
@@ -80,13 +175,48 @@ class LeasingTrackerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         translation_key=CONF_DISTANCE_UNIT,
                     )
                 ),
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL, default=DEFAULT_MIN_UPDATE_INTERVAL
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_MIN_KM_DELTA, default=DEFAULT_MIN_KM_DELTA
+                ): cv.positive_float,
+                vol.Required(
+                    CONF_SENSOR_GROUPS,
+                    default=await async_default_sensor_groups(self.hass),
+                ): SENSOR_GROUPS_SELECTOR,
+                vol.Optional(
+                    CONF_SAVE_DEFAULT_SENSOR_GROUPS, default=False
+                ): cv.boolean,
+                vol.Required(
+                    CONF_FORECAST_MODE, default=DEFAULT_FORECAST_MODE
+                ): FORECAST_MODE_SELECTOR,
+                vol.Optional(CONF_KM_DIFFERENCE_THRESHOLD): vol.Coerce(int),
+                vol.Optional(CONF_MONTH_BUDGET_THRESHOLD): vol.Coerce(int),
+                vol.Required(
+                    CONF_EVENT_HYSTERESIS, default=DEFAULT_EVENT_HYSTERESIS
+                ): cv.positive_int,
             }
         )
 
         return self.async_show_form(
-            step_id="user", data_schema=data_schema, errors=errors
+            step_id="lease", data_schema=data_schema, errors=errors
         )
 
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create a lease from the bulk_update service."""
+        await self.async_set_unique_id(lease_unique_id(import_data[CONF_NAME]))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(
+        cls, config_entry: config_entries.ConfigEntry
+    ) -> bool:
+        """Return options flow support (not for the fleet)."""
+        return config_entry.data.get(CONF_ENTRY_TYPE) != ENTRY_TYPE_FLEET
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -114,7 +244,10 @@ class LeasingTrackerOptionsFlow(config_entries.OptionsFlow):
             try:
                 if user_input[CONF_END_DATE] <= user_input[CONF_START_DATE]:
                     errors["base"] = "end_before_start"
+                elif not user_input[CONF_SENSOR_GROUPS]:
+                    errors["base"] = "no_sensor_groups"
                 else:
+                    await _async_save_sensor_groups(self.hass, user_input)
                     # Update der Config Entry
                     self.hass.config_entries.async_update_entry(
                         self._config_entry,
@@ -166,6 +299,56 @@ class LeasingTrackerOptionsFlow(config_entries.OptionsFlow):
                         translation_key=CONF_DISTANCE_UNIT,
                     )
                 ),
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=self._config_entry.data.get(
+                        CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_MIN_KM_DELTA,
+                    default=self._config_entry.data.get(
+                        CONF_MIN_KM_DELTA, DEFAULT_MIN_KM_DELTA
+                    ),
+                ): cv.positive_float,
+                vol.Required(
+                    CONF_SENSOR_GROUPS,
+                    default=self._config_entry.data.get(
+                        CONF_SENSOR_GROUPS, DEFAULT_SENSOR_GROUPS
+                    ),
+                ): SENSOR_GROUPS_SELECTOR,
+                vol.Optional(
+                    CONF_SAVE_DEFAULT_SENSOR_GROUPS, default=False
+                ): cv.boolean,
+                vol.Required(
+                    CONF_FORECAST_MODE,
+                    default=self._config_entry.data.get(
+                        CONF_FORECAST_MODE, DEFAULT_FORECAST_MODE
+                    ),
+                ): FORECAST_MODE_SELECTOR,
+                # Leer lassen schaltet die Ereignisse des Schwellwerts ab
+                vol.Optional(
+                    CONF_KM_DIFFERENCE_THRESHOLD,
+                    description={
+                        "suggested_value": self._config_entry.data.get(
+                            CONF_KM_DIFFERENCE_THRESHOLD
+                        )
+                    },
+                ): vol.Coerce(int),
+                vol.Optional(
+                    CONF_MONTH_BUDGET_THRESHOLD,
+                    description={
+                        "suggested_value": self._config_entry.data.get(
+                            CONF_MONTH_BUDGET_THRESHOLD
+                        )
+                    },
+                ): vol.Coerce(int),
+                vol.Required(
+                    CONF_EVENT_HYSTERESIS,
+                    default=self._config_entry.data.get(
+                        CONF_EVENT_HYSTERESIS, DEFAULT_EVENT_HYSTERESIS
+                    ),
+                ): cv.positive_int,
             }
         )
 
@@ -2,7 +2,15 @@
 
 DOMAIN = "leasing_tracker"
 
+STORAGE_VERSION = 1
+STORAGE_KEY_HISTORY = f"{DOMAIN}.history"
+STORAGE_KEY_DEFAULTS = f"{DOMAIN}.defaults"
+
+DATA_BACKFILL = f"{DOMAIN}_backfill"
+DATA_FLEET = f"{DOMAIN}_fleet"
+
 # Configuration
+CONF_ENTRY_TYPE = "entry_type"
 CONF_NAME = "name"
 CONF_CURRENT_KM_ENTITY = "current_km_entity"
 CONF_START_DATE = "start_date"
@@ -10,9 +18,55 @@ CONF_END_DATE = "end_date"
 CONF_START_KM = "start_km"
 CONF_KM_PER_YEAR = "km_per_year"
 CONF_DISTANCE_UNIT = "distance_unit"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MIN_KM_DELTA = "min_km_delta"
+CONF_SENSOR_GROUPS = "sensor_groups"
+CONF_SAVE_DEFAULT_SENSOR_GROUPS = "save_default_sensor_groups"
+CONF_FORECAST_MODE = "forecast_mode"
+CONF_KM_DIFFERENCE_THRESHOLD = "km_difference_threshold"
+CONF_MONTH_BUDGET_THRESHOLD = "month_budget_threshold"
+CONF_EVENT_HYSTERESIS = "event_hysteresis"
+
+DEFAULT_MIN_UPDATE_INTERVAL = 0
+DEFAULT_MIN_KM_DELTA = 0
+DEFAULT_EVENT_HYSTERESIS = 50
+
+EVENT_THRESHOLD_CROSSED = f"{DOMAIN}_threshold_crossed"
+
+FORECAST_MODE_AVERAGE = "average"
+FORECAST_MODE_ADAPTIVE = "adaptive"
+FORECAST_MODES = [FORECAST_MODE_AVERAGE, FORECAST_MODE_ADAPTIVE]
+DEFAULT_FORECAST_MODE = FORECAST_MODE_AVERAGE
+
+ENTRY_TYPE_LEASE = "lease"
+ENTRY_TYPE_FLEET = "fleet"
 
 UNIT_KILOMETERS = "km"
 UNIT_MILES = "mi"
+
+STATUS_OPTIONS = ["far_above_plan", "above_plan", "on_track", "below_plan"]
+
+# Sensor groups
+SENSOR_GROUP_TOTAL = "total"
+SENSOR_GROUP_YEAR_ACTUAL = "year_actual"
+SENSOR_GROUP_YEAR_ESTIMATED = "year_estimated"
+SENSOR_GROUP_MONTH_ACTUAL = "month_actual"
+SENSOR_GROUP_MONTH_ESTIMATED = "month_estimated"
+SENSOR_GROUP_TIME = "time"
+SENSOR_GROUP_STATUS = "status"
+
+SENSOR_GROUPS = [
+    SENSOR_GROUP_TOTAL,
+    SENSOR_GROUP_YEAR_ACTUAL,
+    SENSOR_GROUP_YEAR_ESTIMATED,
+    SENSOR_GROUP_MONTH_ACTUAL,
+    SENSOR_GROUP_MONTH_ESTIMATED,
+    SENSOR_GROUP_TIME,
+    SENSOR_GROUP_STATUS,
+]
+# Vorauswahl für neue Leasings, solange keine gespeichert ist
+DEFAULT_SENSOR_GROUPS = SENSOR_GROUPS
+
 # Sensor types
 SENSOR_REMAINING_KM_TOTAL = "remaining_km_total"
 SENSOR_REMAINING_KM_YEAR = "remaining_km_year"
@@ -36,3 +90,12 @@ SENSOR_DAYS_TOTAL = "days_total"
 SENSOR_PROGRESS_PERCENTAGE = "progress_percentage"
 SENSOR_KM_DIFFERENCE = "km_difference"
 SENSOR_STATUS = "status"
+SENSOR_METRICS = "metrics"
+
+# Fleet sensor types
+SENSOR_FLEET_REMAINING_KM_TOTAL = "fleet_remaining_km_total"
+SENSOR_FLEET_LEASES_FAR_ABOVE_PLAN = "fleet_leases_far_above_plan"
+SENSOR_FLEET_LEASES_ABOVE_PLAN = "fleet_leases_above_plan"
+SENSOR_FLEET_LEASES_ON_TRACK = "fleet_leases_on_track"
+SENSOR_FLEET_LEASES_BELOW_PLAN = "fleet_leases_below_plan"
+SENSOR_FLEET_WORST_KM_DIFFERENCE = "fleet_worst_km_difference"
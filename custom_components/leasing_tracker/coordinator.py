@@ -0,0 +1,537 @@
+"""Coordinator for Leasing Tracker."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import date, datetime, timedelta
+import logging
+import time
+from typing import Any
+import zlib
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .calculation import (
+    LeaseDates,
+    LeaseParameters,
+    calculate_dates,
+    calculate_values,
+)
+from .const import (
+    CONF_CURRENT_KM_ENTITY,
+    CONF_DISTANCE_UNIT,
+    CONF_EVENT_HYSTERESIS,
+    CONF_FORECAST_MODE,
+    CONF_KM_DIFFERENCE_THRESHOLD,
+    CONF_MIN_KM_DELTA,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_MONTH_BUDGET_THRESHOLD,
+    CONF_NAME,
+    CONF_SENSOR_GROUPS,
+    DEFAULT_EVENT_HYSTERESIS,
+    DEFAULT_FORECAST_MODE,
+    DEFAULT_MIN_KM_DELTA,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    EVENT_THRESHOLD_CROSSED,
+    FORECAST_MODE_ADAPTIVE,
+    STORAGE_KEY_HISTORY,
+    STORAGE_VERSION,
+    UNIT_MILES,
+)
+from .estimators import UsageEstimator
+from .history import OdometerHistory
+from .metrics import LeaseMetrics
+from .projection import daily_distances
+from .thresholds import ThresholdTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_SAVE_DELAY = 60
+
+# Optionen, deren Änderung andere Entitäten oder Listener erfordert
+RELOAD_OPTIONS = (CONF_CURRENT_KM_ENTITY, CONF_SENSOR_GROUPS)
+THRESHOLD_OPTIONS = (
+    CONF_KM_DIFFERENCE_THRESHOLD,
+    CONF_MONTH_BUDGET_THRESHOLD,
+    CONF_EVENT_HYSTERESIS,
+)
+
+
+def start_of_today() -> datetime:
+    """Return the start of the current local day as naive datetime."""
+    return dt_util.now().replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    )
+
+
+def threshold_tracker(config: Mapping[str, Any]) -> ThresholdTracker:
+    """Return a threshold tracker for the options of a lease."""
+    return ThresholdTracker(
+        config.get(CONF_EVENT_HYSTERESIS, DEFAULT_EVENT_HYSTERESIS),
+        config.get(CONF_KM_DIFFERENCE_THRESHOLD),
+        config.get(CONF_MONTH_BUDGET_THRESHOLD),
+    )
+
+
+def history_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the odometer history of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY_HISTORY}.{entry_id}")
+
+
+class LeasingTrackerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Calculate the leasing values once per entry and share them with all sensors.
+
+    There is no polling: the values only change when the current KM entity
+    changes or when a new day (and with it possibly a new month or year)
+    begins. The day rollover is handled for all leases together by the
+    fleet.
+
+    Readings that differ less than the configured minimum distance from the
+    last calculated reading are dropped, and recalculations are limited to
+    one per minimum update interval (further readings within the interval
+    are coalesced into a single trailing recalculation).
+
+    The daily closing readings are kept in an odometer history, so the KM
+    driven this month and year are based on the actual readings at the
+    start of the period instead of an estimate.
+
+    Every completed day also updates the streaming usage estimators. In the
+    adaptive forecast mode they replace the lifetime average for the
+    estimated KM at the end of the year and month.
+
+    Every calculation also checks the status and the configured KM
+    thresholds and fires an event for each crossing (with hysteresis).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        config = entry.data
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=config.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+            immediate=True,
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN}_{entry.entry_id}",
+            request_refresh_debouncer=self._debouncer,
+        )
+        self._entry = entry
+        self._config = config
+        self._current_km_entity = self._config[CONF_CURRENT_KM_ENTITY]
+        self._params = LeaseParameters.from_config(self._config)
+        self._dates: LeaseDates | None = None
+        self._min_km_delta = config.get(CONF_MIN_KM_DELTA, DEFAULT_MIN_KM_DELTA)
+        self._forecast_mode = config.get(CONF_FORECAST_MODE, DEFAULT_FORECAST_MODE)
+        self._last_km: float | None = None
+        self._store = history_store(hass, entry.entry_id)
+        self._history = OdometerHistory()
+        self._estimator = UsageEstimator()
+        self._forecast: tuple[datetime, float, float] | None = None
+        self._period_start: tuple[datetime, float | None, float | None] | None = None
+        self.history_loaded = False
+        # Letzter Tag, der in die Langzeitstatistik übernommen wurde
+        self.statistics_until: date | None = None
+        self.metrics = LeaseMetrics()
+        self._pending_events = 0
+        # Monte-Carlo-Prognose zum Leasingende, einmal pro Tag berechnet
+        self.projection: dict[str, Any] | None = None
+        self.projection_day: date | None = None
+        self._thresholds = threshold_tracker(config)
+        self._crossing_listeners: list[Callable[[dict[str, Any]], None]] = []
+
+    @property
+    def entry_id(self) -> str:
+        """Return the ID of the config entry of the lease."""
+        return self._entry.entry_id
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Return the configuration the values are calculated with."""
+        return self._config
+
+    @property
+    def distance_unit(self) -> str:
+        """Return the distance unit of the lease."""
+        return self._config.get(CONF_DISTANCE_UNIT, UNIT_MILES)
+
+    @property
+    def params(self) -> LeaseParameters:
+        """Return the contract parameters."""
+        return self._params
+
+    @property
+    def history(self) -> OdometerHistory:
+        """Return the odometer history."""
+        return self._history
+
+    @property
+    def estimator(self) -> UsageEstimator:
+        """Return the usage estimator of the adaptive forecast."""
+        return self._estimator
+
+    @property
+    def current_km_entity(self) -> str:
+        """Return the entity providing the current KM reading."""
+        return self._current_km_entity
+
+    @property
+    def backfill_start(self) -> date:
+        """Return the first day whose closing reading is needed."""
+        year_start = max(
+            self._params.start_date, datetime(dt_util.now().year, 1, 1)
+        )
+        return (year_start - timedelta(days=1)).date()
+
+    @callback
+    def async_update_config(self, config: Mapping[str, Any]) -> bool:
+        """Take over a changed configuration without reloading.
+
+        Returns False if the change needs a reload of the config entry.
+        """
+        if any(config.get(key) != self._config.get(key) for key in RELOAD_OPTIONS):
+            return False
+
+        params = LeaseParameters.from_config(config)
+        if params != self._params or any(
+            config.get(key) != self._config.get(key)
+            for key in (CONF_NAME, CONF_DISTANCE_UNIT)
+        ):
+            # Langzeitstatistik mit den neuen Daten neu erstellen
+            self.statistics_until = None
+        if any(config.get(key) != self._config.get(key) for key in THRESHOLD_OPTIONS):
+            # Neue Schwellwerte: Zonen neu bestimmen, ohne Ereignisse auszulösen
+            self._thresholds = threshold_tracker(config)
+
+        self._config = config
+        self._params = params
+        self._dates = None
+        self._period_start = None
+        self._min_km_delta = config.get(CONF_MIN_KM_DELTA, DEFAULT_MIN_KM_DELTA)
+        self._forecast_mode = config.get(CONF_FORECAST_MODE, DEFAULT_FORECAST_MODE)
+        self._forecast = None
+        self.projection_day = None
+        self._debouncer.cooldown = config.get(
+            CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+        )
+        return True
+
+    async def _async_setup(self) -> None:
+        """Load the odometer history."""
+        if data := await self._store.async_load():
+            self._history = OdometerHistory.from_dict(data)
+            self.history_loaded = True
+            if (until := data.get("statistics_until")) is not None:
+                self.statistics_until = date.fromordinal(until)
+            if estimator := data.get("estimator"):
+                self._estimator = UsageEstimator.from_dict(estimator)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the odometer history (delayed, to bundle frequent changes)."""
+        self._store.async_delay_save(self._store_data, HISTORY_SAVE_DELAY)
+
+    def _store_data(self) -> dict[str, Any]:
+        """Return the data to store."""
+        until = self.statistics_until
+        return {
+            **self._history.as_dict(),
+            "statistics_until": None if until is None else until.toordinal(),
+            "estimator": self._estimator.as_dict(),
+        }
+
+    @callback
+    def async_seed_history(self, readings: list[tuple[date, float]]) -> bool:
+        """Add daily closing readings from before the stored history.
+
+        Returns True if the history changed and the values need to be
+        recalculated.
+        """
+        older = OdometerHistory()
+        backfill_start = self.backfill_start
+        for day, km in readings:
+            if day >= backfill_start:
+                older.record(day, km)
+
+        if not self._history.merge_older(older):
+            return False
+
+        self._async_history_extended()
+        return True
+
+    @callback
+    def async_import_history(
+        self, readings: list[tuple[date, float]]
+    ) -> tuple[int, int]:
+        """Add imported daily closing readings (oldest first) to the history.
+
+        Only days from the start of the lease up to the first stored day are
+        taken over; the stored readings take precedence. Readings above the
+        first stored reading are rejected. Returns the number of days added
+        and of readings rejected.
+        """
+        history = self._history
+        first_stored = history.first_day if len(history) else None
+        limit = history.readings[0] if len(history) else float("inf")
+        first_day = (self._params.start_date - timedelta(days=1)).date()
+
+        older = OdometerHistory()
+        rejected = 0
+        for day, km in readings:
+            if day < first_day or (
+                first_stored is not None and day.toordinal() >= first_stored
+            ):
+                continue
+            if km > limit:
+                rejected += 1
+                continue
+            older.record(day, km)
+
+        days = len(history)
+        if not history.merge_older(older):
+            return 0, rejected
+
+        self._async_history_extended()
+        return len(history) - days, rejected
+
+    @callback
+    def _async_history_extended(self) -> None:
+        """Recalculate everything depending on older days of the history."""
+        self.statistics_until = None
+        self.async_schedule_save()
+        self._period_start = None
+        self.projection_day = None
+        # Neu aus den letzten Tagen aufbauen, die älteren kannte er nicht
+        self._estimator = UsageEstimator()
+        self._forecast = None
+
+    @callback
+    def async_handle_odometer_event(self, event: Event) -> None:
+        """Handle a state change of the current KM entity (dispatched by the fleet)."""
+        self.metrics.odometer_events += 1
+        current_km = self._parse_km(event.data["new_state"])
+        if (
+            current_km is not None
+            and self._last_km is not None
+            and abs(current_km - self._last_km) < self._min_km_delta
+        ):
+            self.metrics.dropped_events += 1
+            return
+
+        self._pending_events += 1
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Recalculate all leasing values."""
+        # Alle seit der letzten Berechnung eingegangenen Ereignisse bis auf
+        # eines wurden vom Debouncer zusammengefasst
+        if self._pending_events > 1:
+            self.metrics.coalesced_events += self._pending_events - 1
+        self._pending_events = 0
+        return self._calculate_values()
+
+    def _get_current_km(self) -> float | None:
+        """Get current KM from entity."""
+        return self._parse_km(self.hass.states.get(self._current_km_entity))
+
+    @staticmethod
+    def _parse_km(state: State | None) -> float | None:
+        """Convert a state of the current KM entity to a float."""
+        if state is None or state.state in ["unknown", "unavailable"]:
+            return None
+        
+        try:
+            return float(state.state)
+        except (ValueError, TypeError):
+            _LOGGER.warning(
+                "Could not convert current KM state to float: %s", state.state
+            )
+            return None
+
+    def _get_dates(self, today: datetime) -> LeaseDates:
+        """Return the date-derived values, recalculated once per day."""
+        if self._dates is None or self._dates.today != today:
+            self._dates = calculate_dates(self._params, today)
+        return self._dates
+
+    def _get_period_start(self, today: datetime) -> tuple[float | None, float | None]:
+        """Return the KM readings at the start of the current year and month."""
+        if self._period_start is None or self._period_start[0] != today:
+            self._period_start = (
+                today,
+                *self._period_start_readings(self._params, today),
+            )
+        return self._period_start[1:]
+
+    def _period_start_readings(
+        self, params: LeaseParameters, today: datetime
+    ) -> tuple[float | None, float | None]:
+        """Look up the KM readings at the start of the year and month of a lease."""
+        year_start = max(params.start_date, datetime(today.year, 1, 1))
+        month_start = datetime(today.year, today.month, 1)
+        # Schlussstand des Vortags
+        day = timedelta(days=1)
+        return (
+            self._history.closing((year_start - day).date()),
+            self._history.closing((month_start - day).date()),
+        )
+
+    def scenario_input(
+        self, params: LeaseParameters, today: datetime
+    ) -> tuple[LeaseParameters, float, float | None, float | None] | None:
+        """Return the batch input of a what-if scenario of this lease.
+
+        Uses the last calculated KM reading and the history, without reading
+        the current KM entity or changing the lease.
+        """
+        current_km = self._last_km
+        if current_km is None and (current_km := self._history.latest) is None:
+            return None
+        if params.start_date == self._params.start_date:
+            period_start = self._get_period_start(today)
+        else:
+            period_start = self._period_start_readings(params, today)
+        return (params, current_km, *period_start)
+
+    def _read_current_km(self, today: datetime) -> float | None:
+        """Read the current KM and keep it as closing reading of the day.
+
+        While the current KM entity has no valid state (e.g. a cloud
+        integration still starting after a restart), the last reading of the
+        stored history is used, so the values are available right away.
+        """
+        current_km = self._get_current_km()
+        if current_km is None:
+            current_km = self._history.latest
+        elif self._history.record(today.date(), current_km):
+            self.async_schedule_save()
+        # Einmal pro Tag die abgeschlossenen Tage übernehmen
+        if self._estimator.update(self._history, today.date()):
+            self._forecast = None
+            self.async_schedule_save()
+        self._last_km = current_km
+        return current_km
+
+    def batch_input(
+        self, today: datetime
+    ) -> tuple[LeaseParameters, float, float | None, float | None] | None:
+        """Return the inputs for a batch calculation of this lease."""
+        if (current_km := self._read_current_km(today)) is None:
+            return None
+        return (self._params, current_km, *self._get_period_start(today))
+
+    def _calculate_values(self) -> dict[str, Any]:
+        """Calculate all leasing values."""
+        start = time.perf_counter()
+        today = start_of_today()
+        current_km = self._read_current_km(today)
+        if current_km is None:
+            return {}
+
+        values = calculate_values(
+            self._params,
+            self._get_dates(today),
+            current_km,
+            *self._get_period_start(today),
+        )
+        self._finish_values(values, today)
+        self.metrics.record_calculation(time.perf_counter() - start)
+        return values
+
+    @callback
+    def async_set_batch_values(self, values: dict[str, Any], today: datetime) -> None:
+        """Take over the values of this lease from a batch calculation."""
+        self.async_set_updated_data(self._finish_values(values, today))
+
+    def _finish_values(self, values: dict[str, Any], today: datetime) -> dict[str, Any]:
+        """Apply the forecast and report threshold crossings of new values."""
+        self._apply_forecast(values, today)
+        for crossing in self._thresholds.update(values):
+            self._async_report_crossing(crossing)
+        return values
+
+    @callback
+    def async_add_crossing_listener(
+        self, crossing_callback: Callable[[dict[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for threshold crossings of this lease (the event entity)."""
+        self._crossing_listeners.append(crossing_callback)
+
+        @callback
+        def async_remove_listener() -> None:
+            """Remove the listener."""
+            self._crossing_listeners.remove(crossing_callback)
+
+        return async_remove_listener
+
+    @callback
+    def _async_report_crossing(self, crossing: dict[str, Any]) -> None:
+        """Fire the event of a threshold crossing."""
+        data = {
+            "entry_id": self.entry_id,
+            "name": self._config[CONF_NAME],
+            **crossing,
+        }
+        self.hass.bus.async_fire(EVENT_THRESHOLD_CROSSED, data)
+        for crossing_callback in list(self._crossing_listeners):
+            crossing_callback(data)
+
+    def projection_input(
+        self, today: datetime
+    ) -> tuple[list[float], float, int, int, int] | None:
+        """Return the input of the mileage projection (None without values)."""
+        if not (values := self.data):
+            return None
+        return (
+            daily_distances(self._history, today.date()),
+            values["total_km_driven"],
+            values["remaining_days"],
+            values["allowed_km_total"],
+            # Reproduzierbar innerhalb eines Tages
+            today.toordinal() << 32 | zlib.crc32(self.entry_id.encode()),
+        )
+
+    @callback
+    def async_set_projection(
+        self, day: date, projection: dict[str, Any] | None
+    ) -> None:
+        """Take over the projection of a day and notify the sensors."""
+        self.projection_day = day
+        if projection != self.projection:
+            self.projection = projection
+            self.async_update_listeners()
+
+    def _apply_forecast(
+        self, values: dict[str, Any], today: datetime
+    ) -> dict[str, Any]:
+        """Replace the average-based estimates in the adaptive forecast mode."""
+        estimator = self._estimator
+        if self._forecast_mode != FORECAST_MODE_ADAPTIVE or not estimator.ready:
+            return values
+
+        # Prognose ändert sich nur mit einem neuen Tag
+        if self._forecast is None or self._forecast[0] != today:
+            dates = self._get_dates(today)
+            day = today.date()
+            self._forecast = (
+                today,
+                estimator.forecast(day, max(0, dates.days_remaining_this_year)),
+                estimator.forecast(day, max(0, dates.days_remaining_this_month)),
+            )
+
+        _, year_forecast, month_forecast = self._forecast
+        for period, forecast in (("year", year_forecast), ("month", month_forecast)):
+            estimated = int(values[f"km_driven_this_{period}"] + forecast)
+            values[f"estimated_km_{period}_end"] = estimated
+            values[f"remaining_km_{period}"] = (
+                values[f"allowed_km_this_{period}"] - estimated
+            )
+        return values
@@ -0,0 +1,56 @@
+"""Diagnostics support for Leasing Tracker."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ENTRY_TYPE, DATA_FLEET, DOMAIN, ENTRY_TYPE_FLEET
+from .coordinator import LeasingTrackerCoordinator
+from .fleet import LeasingFleet
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        fleet: LeasingFleet = hass.data[DATA_FLEET]
+        aggregates = fleet.aggregates
+        worst = aggregates.worst_km_difference
+        return {
+            "entry": dict(entry.data),
+            "leases": len(fleet),
+            "remaining_km_total": aggregates.remaining_km_total,
+            "status_counts": dict(aggregates.status_counts),
+            "worst_km_difference": None if worst is None else list(worst),
+        }
+
+    coordinator: LeasingTrackerCoordinator = hass.data[DOMAIN][entry.entry_id]
+    history = coordinator.history
+    return {
+        "entry": dict(entry.data),
+        "values": coordinator.data,
+        "metrics": coordinator.metrics.as_dict(),
+        "history": {
+            "first_day": (
+                date.fromordinal(history.first_day).isoformat() if len(history) else None
+            ),
+            "days": len(history),
+        },
+        "estimator": {
+            **coordinator.estimator.as_dict(),
+            "ready": coordinator.estimator.ready,
+            "slope": coordinator.estimator.slope,
+        },
+        "projection": {
+            "day": (
+                coordinator.projection_day.isoformat()
+                if coordinator.projection_day
+                else None
+            ),
+            **(coordinator.projection or {}),
+        },
+    }
@@ -0,0 +1,191 @@
+"""Streaming usage estimators for the adaptive forecast of Leasing Tracker.
+
+Like ``calculation``, this module only uses the standard library and has no
+imports from the integration.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Protocol
+
+# Halbwertszeiten in Tagen
+RATE_HALF_LIFE = 14
+TREND_HALF_LIFE = 28
+# Halbwertszeit der Wochentagsfaktoren in Wochen
+SEASON_HALF_LIFE = 8
+# Tage, über die ein Trend höchstens fortgeschrieben wird
+TREND_HORIZON = 30
+# Beobachtete Tage, ab denen die Prognose verwendet wird
+MIN_DAYS = 14
+# Tage aus dem Verlauf, mit denen ein neuer Schätzer startet
+BOOTSTRAP_DAYS = 56
+# Wochentage mit kaum Fahrleistung sagen nichts über das Niveau aus
+MIN_FACTOR = 0.1
+# Gespeicherte Schätzer anderer Versionen werden neu aufgebaut
+VERSION = 2
+
+RATE_ALPHA = 1 - 0.5 ** (1 / RATE_HALF_LIFE)
+SEASON_ALPHA = 1 - 0.5 ** (1 / SEASON_HALF_LIFE)
+TREND_DECAY = 0.5 ** (1 / TREND_HALF_LIFE)
+
+
+class DailyReadings(Protocol):
+    """Source of daily closing readings (the odometer history)."""
+
+    def closing(self, day: date) -> float | None:
+        """Return the closing reading of a day, if known."""
+
+
+class UsageEstimator:
+    """Constant-memory estimators of the distance driven per day.
+
+    Every completed day updates, in O(1):
+
+    * exponentially weighted means per weekday (the seasonality),
+    * an exponentially weighted daily rate (the level) and
+    * an exponentially weighted linear regression of the daily distance
+      over time (the trend).
+
+    Like in Holt-Winters, level and trend see the deseasonalized distance
+    (divided by the weekday factor), so a steady weekly pattern shows up
+    neither in the level nor in the trend. The first week only sets the
+    weekday means.
+
+    The forecast for a day ahead is the level, moved along the (damped)
+    trend and scaled by the weekday factor.
+    """
+
+    __slots__ = ("days", "last_day", "rate", "weekday_means", "_trend")
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.days = 0
+        self.last_day: int | None = None
+        self.rate = 0.0
+        self.weekday_means: list[float | None] = [None] * 7
+        # Gewichtete Summen: Gewicht, t, t², y, t·y
+        self._trend = [0.0, 0.0, 0.0, 0.0, 0.0]
+
+    @property
+    def ready(self) -> bool:
+        """Return True if enough days were observed for a forecast."""
+        return self.days >= MIN_DAYS
+
+    @property
+    def slope(self) -> float:
+        """Return the trend of the daily distance per day."""
+        weight, t_sum, tt_sum, y_sum, ty_sum = self._trend
+        denominator = weight * tt_sum - t_sum * t_sum
+        if denominator <= 1e-9:
+            return 0.0
+        return (weight * ty_sum - t_sum * y_sum) / denominator
+
+    def update(self, readings: DailyReadings, today: date) -> bool:
+        """Take over all days completed before today.
+
+        Returns True if the estimator changed.
+        """
+        yesterday = today.toordinal() - 1
+        if self.last_day is not None and self.last_day >= yesterday:
+            return False
+
+        # Neuer Schätzer oder lange Lücke: nur die letzten Tage übernehmen
+        first = yesterday - BOOTSTRAP_DAYS
+        if self.last_day is not None:
+            first = max(first, self.last_day)
+
+        changed = False
+        previous = readings.closing(date.fromordinal(first))
+        for ordinal in range(first + 1, yesterday + 1):
+            closing = readings.closing(date.fromordinal(ordinal))
+            if previous is not None and closing is not None:
+                self._add_day(ordinal, max(0.0, closing - previous))
+                changed = True
+            previous = closing
+        self.last_day = yesterday
+        return changed
+
+    def _add_day(self, ordinal: int, distance: float) -> None:
+        """Add the distance driven on a completed day."""
+        # Wochentag, Faktor vor dem Update wie bei Holt-Winters
+        weekday = date.fromordinal(ordinal).weekday()
+        means = self.weekday_means
+        seasonal = None not in means
+        factor = self._weekday_factors()[weekday]
+        mean = means[weekday]
+        means[weekday] = (
+            distance if mean is None else mean + SEASON_ALPHA * (distance - mean)
+        )
+        t = float(self.days)
+        self.days += 1
+
+        # Erste Woche: Niveau startet beim Mittel der Wochentage
+        if not seasonal:
+            if None not in means:
+                self.rate = sum(means) / 7
+            return
+        if factor < MIN_FACTOR:
+            return
+
+        # Niveau, bereinigt um den Wochentag
+        level = distance / factor
+        self.rate += RATE_ALPHA * (level - self.rate)
+
+        # Trend, t relativ zum ersten Tag
+        trend = self._trend
+        for index in range(5):
+            trend[index] *= TREND_DECAY
+        trend[0] += 1
+        trend[1] += t
+        trend[2] += t * t
+        trend[3] += level
+        trend[4] += t * level
+
+    def _weekday_factors(self) -> list[float]:
+        """Return the factor of every weekday relative to the average day."""
+        means = self.weekday_means
+        if any(mean is None for mean in means):
+            return [1.0] * 7
+        average = sum(means) / 7
+        if average <= 0:
+            return [1.0] * 7
+        return [mean / average for mean in means]
+
+    def forecast(self, today: date, days: int) -> float:
+        """Return the distance expected on the next days after today."""
+        factors = self._weekday_factors()
+        slope = self.slope
+        weekday = today.weekday()
+        total = 0.0
+        for ahead in range(1, days + 1):
+            rate = max(0.0, self.rate + slope * min(ahead, TREND_HORIZON))
+            total += rate * factors[(weekday + ahead) % 7]
+        return total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the estimator as a JSON serializable dict."""
+        return {
+            "version": VERSION,
+            "days": self.days,
+            "last_day": self.last_day,
+            "rate": self.rate,
+            "weekday_means": self.weekday_means,
+            "trend": self._trend,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> UsageEstimator:
+        """Restore the estimator from its dict representation.
+
+        An estimator stored by another version starts over and is rebuilt
+        from the recorded days.
+        """
+        estimator = cls()
+        if data.get("version") != VERSION:
+            return estimator
+        estimator.days = data["days"]
+        estimator.last_day = data["last_day"]
+        estimator.rate = data["rate"]
+        estimator.weekday_means = list(data["weekday_means"])
+        estimator._trend = list(data["trend"])
+        return estimator
@@ -0,0 +1,90 @@
+"""Event platform for Leasing Tracker."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.event import EventEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import CONF_ENTRY_TYPE, CONF_NAME, DOMAIN, ENTRY_TYPE_FLEET
+from .coordinator import LeasingTrackerCoordinator
+from .thresholds import (
+    STATUS_ZONES,
+    THRESHOLD_ZONES,
+    TRIGGER_KM_DIFFERENCE,
+    TRIGGER_REMAINING_KM_MONTH,
+    TRIGGER_STATUS,
+)
+
+TRANSLATION_KEY_THRESHOLD_CROSSED = "threshold_crossed"
+
+# Statuswechsel: neuer Status, Schwellwerte: Wert und Richtung
+EVENT_TYPES = [
+    *STATUS_ZONES,
+    *(
+        f"{trigger}_{zone}"
+        for trigger in (TRIGGER_KM_DIFFERENCE, TRIGGER_REMAINING_KM_MONTH)
+        for zone in THRESHOLD_ZONES
+    ),
+]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Leasing Tracker event entity."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return
+
+    coordinator: LeasingTrackerCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([LeasingThresholdEvent(coordinator, entry)])
+
+
+class LeasingThresholdEvent(EventEntity):
+    """Event entity of the threshold crossings of a lease.
+
+    Disabled by default; the ``leasing_tracker_threshold_crossed`` events on
+    the event bus are fired either way.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_translation_key = TRANSLATION_KEY_THRESHOLD_CROSSED
+    _attr_icon = "mdi:bell-ring-outline"
+    _attr_entity_registry_enabled_default = False
+    _attr_event_types = EVENT_TYPES
+
+    def __init__(
+        self, coordinator: LeasingTrackerCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the event entity."""
+        self._coordinator = coordinator
+        self._attr_unique_id = f"{entry.entry_id}_{TRANSLATION_KEY_THRESHOLD_CROSSED}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.data[CONF_NAME],
+            manufacturer="Leasing Tracker",
+            model="Car Leasing Monitor",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for threshold crossings of the lease."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.async_add_crossing_listener(self._handle_crossing)
+        )
+
+    @callback
+    def _handle_crossing(self, crossing: dict[str, Any]) -> None:
+        """Trigger the event of a threshold crossing."""
+        trigger = crossing["trigger"]
+        event_type = (
+            crossing["to"] if trigger == TRIGGER_STATUS else f"{trigger}_{crossing['to']}"
+        )
+        self._trigger_event(event_type, crossing)
+        self.async_write_ha_state()
@@ -0,0 +1,248 @@
+"""Fleet of all leases for Leasing Tracker."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+
+from .aggregates import FleetAggregates
+from .batch import calculate_batch
+from .coordinator import start_of_today
+from .projection import project_batch
+from .recorder_statistics import async_publish_statistics
+
+if TYPE_CHECKING:
+    from .coordinator import LeasingTrackerCoordinator
+
+
+class LeasingFleet:
+    """All leases set up in this Home Assistant instance.
+
+    There is one state subscription per current KM entity, shared by all
+    leases using it (e.g. overlapping contracts of the same car). A state
+    change is dispatched through an index from entity ID to leases, so it
+    only touches the leases of that entity.
+
+    The day rollover at local midnight is handled here with a single timer,
+    and all leases are recalculated together with one batch calculation
+    instead of one calculation per lease.
+
+    Leases whose options changed are collected and recalculated together
+    as well, so changing many leases at once results in a single batch.
+
+    The Monte Carlo projection to the end of the leases is calculated at
+    most once per day and lease, for all pending leases together in an
+    executor job.
+
+    The fleet totals are updated from every new result of a lease. Their
+    listeners (the fleet sensors) are notified once per event loop
+    iteration, so a batch over all leases results in a single update.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.aggregates = FleetAggregates()
+        self._coordinators: set[LeasingTrackerCoordinator] = set()
+        self._unsub_midnight: CALLBACK_TYPE | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._notify_scheduled = False
+        self._refresh_pending: set[LeasingTrackerCoordinator] = set()
+        self._by_entity: dict[str, set[LeasingTrackerCoordinator]] = {}
+        self._unsub_entity: dict[str, CALLBACK_TYPE] = {}
+        self._projection_pending: set[LeasingTrackerCoordinator] = set()
+        self._projection_running = False
+
+    def __len__(self) -> int:
+        """Return the number of leases."""
+        return len(self._coordinators)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the fleet totals."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def async_remove_listener() -> None:
+            """Remove the listener."""
+            self._listeners.remove(update_callback)
+
+        return async_remove_listener
+
+    @callback
+    def _async_aggregates_changed(self) -> None:
+        """Schedule a notification of the listeners."""
+        if self._notify_scheduled or not self._listeners:
+            return
+        self._notify_scheduled = True
+        self.hass.loop.call_soon(self._async_notify_listeners)
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        """Notify the listeners about changed fleet totals."""
+        self._notify_scheduled = False
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_add(self, coordinator: LeasingTrackerCoordinator) -> CALLBACK_TYPE:
+        """Add a lease to the fleet."""
+        self._coordinators.add(coordinator)
+        entry_id = coordinator.entry_id
+        entity_id = coordinator.current_km_entity
+        if (leases := self._by_entity.get(entity_id)) is None:
+            self._by_entity[entity_id] = leases = set()
+            self._unsub_entity[entity_id] = async_track_state_change_event(
+                self.hass, [entity_id], self._async_odometer_changed
+            )
+        leases.add(coordinator)
+
+        @callback
+        def async_lease_updated() -> None:
+            """Update the fleet totals with the new values of the lease."""
+            if self.aggregates.update(
+                entry_id, coordinator.data, coordinator.distance_unit
+            ):
+                self._async_aggregates_changed()
+
+        unsub_lease = coordinator.async_add_listener(async_lease_updated)
+        async_lease_updated()
+        async_publish_statistics(self.hass, [coordinator])
+        self.async_schedule_projection([coordinator])
+        if self._unsub_midnight is None:
+            self._unsub_midnight = async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+
+        @callback
+        def async_remove() -> None:
+            """Remove the lease from the fleet."""
+            unsub_lease()
+            if self.aggregates.update(entry_id, None):
+                self._async_aggregates_changed()
+            self._coordinators.discard(coordinator)
+            leases.discard(coordinator)
+            if not leases:
+                del self._by_entity[entity_id]
+                self._unsub_entity.pop(entity_id)()
+            if not self._coordinators and self._unsub_midnight is not None:
+                self._unsub_midnight()
+                self._unsub_midnight = None
+
+        return async_remove
+
+    @callback
+    def _async_odometer_changed(self, event: Event) -> None:
+        """Pass a state change of a current KM entity to its leases."""
+        for coordinator in self._by_entity.get(event.data["entity_id"], ()):
+            coordinator.async_handle_odometer_event(event)
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Recalculate all leases at local midnight (day, month and year rollover)."""
+        for coordinator in self._coordinators:
+            coordinator.metrics.last_rollover = now
+        self.async_refresh()
+        # Der abgeschlossene Vortag kommt in die Langzeitstatistik
+        async_publish_statistics(self.hass, self._coordinators)
+        self.async_schedule_projection(self._coordinators)
+
+    @callback
+    def async_schedule_refresh(self, coordinator: LeasingTrackerCoordinator) -> None:
+        """Recalculate a lease with all others scheduled in this loop iteration."""
+        if not self._refresh_pending:
+            self.hass.loop.call_soon(self._async_refresh_pending)
+        self._refresh_pending.add(coordinator)
+
+    @callback
+    def _async_refresh_pending(self) -> None:
+        """Recalculate the scheduled leases in one batch."""
+        pending = self._refresh_pending & self._coordinators
+        self._refresh_pending = set()
+        self.async_refresh(pending)
+        async_publish_statistics(self.hass, pending)
+        self.async_schedule_projection(pending)
+
+    @callback
+    def async_refresh(
+        self, coordinators: Iterable[LeasingTrackerCoordinator] | None = None
+    ) -> None:
+        """Recalculate leases (default: all) in one batch and push the values."""
+        start = time.perf_counter()
+        today = start_of_today()
+        targets: list[LeasingTrackerCoordinator] = []
+        inputs = []
+        for coordinator in self._coordinators if coordinators is None else coordinators:
+            if (batch_input := coordinator.batch_input(today)) is None:
+                coordinator.async_set_updated_data({})
+                continue
+            targets.append(coordinator)
+            inputs.append(batch_input)
+
+        if not inputs:
+            return
+
+        leases, current_km, km_at_year_start, km_at_month_start = zip(*inputs)
+        results = calculate_batch(
+            leases, today, current_km, km_at_year_start, km_at_month_start
+        )
+        # Anteil jedes Leasings an der Dauer der Batch-Berechnung
+        duration = (time.perf_counter() - start) / len(targets)
+        for coordinator, values in zip(targets, results):
+            coordinator.metrics.record_calculation(duration)
+            coordinator.async_set_batch_values(values, today)
+
+    @callback
+    def async_schedule_projection(
+        self, coordinators: Iterable[LeasingTrackerCoordinator]
+    ) -> None:
+        """Schedule the projection of leases without one for today."""
+        day = start_of_today().date()
+        self._projection_pending.update(
+            coordinator
+            for coordinator in coordinators
+            if coordinator.projection_day != day
+        )
+        if self._projection_pending and not self._projection_running:
+            self._projection_running = True
+            self.hass.async_create_background_task(
+                self._async_project(), "leasing_tracker_projection"
+            )
+
+    async def _async_project(self) -> None:
+        """Project the pending leases in batches in an executor.
+
+        Leases scheduled while a batch is running are taken over by the next
+        batch.
+        """
+        try:
+            while pending := self._projection_pending & self._coordinators:
+                self._projection_pending = set()
+                today = start_of_today()
+                targets: list[LeasingTrackerCoordinator] = []
+                inputs = []
+                for coordinator in pending:
+                    # Ohne KM-Stand beim nächsten Anlass erneut versuchen
+                    if (lease_input := coordinator.projection_input(today)) is None:
+                        continue
+                    targets.append(coordinator)
+                    inputs.append(lease_input)
+                if not inputs:
+                    continue
+
+                results = await self.hass.async_add_executor_job(
+                    project_batch, *zip(*inputs)
+                )
+                for coordinator, projection in zip(targets, results):
+                    if coordinator in self._coordinators:
+                        coordinator.async_set_projection(today.date(), projection)
+        finally:
+            self._projection_pending = set()
+            self._projection_running = False
@@ -0,0 +1,108 @@
+"""Compact odometer history for Leasing Tracker."""
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from typing import Any
+
+
+class OdometerHistory:
+    """Daily closing readings of the current KM entity.
+
+    The readings are kept in a flat array with one slot per day, starting at
+    ``first_day`` (a date ordinal). Days without a reading carry the previous
+    closing reading forward, so the reading for any day is a single index
+    lookup.
+    """
+
+    __slots__ = ("first_day", "readings")
+
+    def __init__(self, first_day: int = 0, readings: array | None = None) -> None:
+        """Initialize the history."""
+        self.first_day = first_day
+        self.readings = readings if readings is not None else array("d")
+
+    def __len__(self) -> int:
+        """Return the number of days covered."""
+        return len(self.readings)
+
+    @property
+    def latest(self) -> float | None:
+        """Return the most recent reading."""
+        return self.readings[-1] if self.readings else None
+
+    def record(self, day: date, km: float) -> bool:
+        """Store a reading as the (current) closing reading of a day.
+
+        Returns True if the history changed.
+        """
+        ordinal = day.toordinal()
+        readings = self.readings
+
+        if not readings:
+            self.first_day = ordinal
+            readings.append(km)
+            return True
+
+        index = ordinal - self.first_day
+        if index < 0:
+            # Tag vor dem ersten bekannten Tag: nach vorne erweitern
+            self.readings = array("d", [km] * -index) + readings
+            self.first_day = ordinal
+            return True
+
+        if index < len(readings):
+            if readings[index] == km:
+                return False
+            readings[index] = km
+            return True
+
+        # Tage ohne Messwert mit dem letzten Stand auffüllen
+        last = readings[-1]
+        readings.extend([last] * (index - len(readings)))
+        readings.append(km)
+        return True
+
+    def merge_older(self, older: OdometerHistory) -> bool:
+        """Take over the days of an older history preceding this one.
+
+        Returns True if the history changed.
+        """
+        if not older.readings:
+            return False
+        if not self.readings:
+            self.first_day = older.first_day
+            self.readings = older.readings
+            return True
+
+        gap = self.first_day - older.first_day
+        if gap <= 0:
+            return False
+
+        head = older.readings[:gap]
+        # Tage zwischen beiden Verläufen mit dem letzten Stand auffüllen
+        head.extend([head[-1]] * (gap - len(head)))
+        self.readings = head + self.readings
+        self.first_day = older.first_day
+        return True
+
+    def closing(self, day: date) -> float | None:
+        """Return the closing reading of a day, if known."""
+        index = day.toordinal() - self.first_day
+        if index < 0:
+            return None
+        if index >= len(self.readings):
+            if not self.readings:
+                return None
+            # Seitdem kein neuer Messwert: der letzte Stand gilt weiter
+            return self.readings[-1]
+        return self.readings[index]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the history as a JSON serializable dict."""
+        return {"first_day": self.first_day, "readings": self.readings.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> OdometerHistory:
+        """Restore the history from its dict representation."""
+        return cls(data["first_day"], array("d", data["readings"]))
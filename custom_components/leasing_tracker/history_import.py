@@ -0,0 +1,176 @@
+"""Streaming import of odometer readings from CSV files for Leasing Tracker.
+
+The file is read row by row, so its size does not matter: per lease only
+the highest reading of every day is kept. ``read_csv_history`` does blocking
+I/O and runs in an executor.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime, tzinfo
+import logging
+import math
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anzahl der gemeldeten Fehler in der Antwort des Dienstes
+MAX_ERRORS = 20
+# Fortschritt im Log alle n Zeilen
+PROGRESS_ROWS = 1_000_000
+
+
+class HistoryImportError(Exception):
+    """The CSV file cannot be imported."""
+
+
+@dataclass(slots=True)
+class HistoryImport:
+    """Daily closing readings per lease and a summary of a CSV import."""
+
+    rows: int = 0
+    invalid_rows: int = 0
+    unknown_lease_rows: int = 0
+    non_monotonic_days: int = 0
+    errors: list[str] = field(default_factory=list)
+    # Pro Leasing: Tages-Ordinal -> höchster Stand des Tages
+    days: dict[str, dict[int, float]] = field(default_factory=dict)
+
+    def add_error(self, message: str) -> None:
+        """Keep the first errors for the summary."""
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(message)
+
+    def readings(self, entry_id: str) -> list[tuple[date, float]]:
+        """Return the monotonic daily closing readings of a lease, oldest first.
+
+        Days whose reading is below the reading of an earlier day are
+        dropped and counted.
+        """
+        readings: list[tuple[date, float]] = []
+        highest = float("-inf")
+        for ordinal, km in sorted(self.days.get(entry_id, {}).items()):
+            day = date.fromordinal(ordinal)
+            if km < highest:
+                self.non_monotonic_days += 1
+                self.add_error(
+                    f"{entry_id}: {day.isoformat()} reading {km} is below"
+                    f" an earlier reading of {highest}"
+                )
+                continue
+            highest = km
+            readings.append((day, km))
+        return readings
+
+    def as_dict(self) -> dict[str, int | list[str]]:
+        """Return the summary of the import."""
+        return {
+            "rows": self.rows,
+            "invalid_rows": self.invalid_rows,
+            "unknown_lease_rows": self.unknown_lease_rows,
+            "non_monotonic_days": self.non_monotonic_days,
+            "errors": self.errors,
+        }
+
+
+def read_csv_history(
+    path: str,
+    *,
+    date_column: str,
+    km_column: str,
+    lease_column: str,
+    leases: Mapping[str, str],
+    default_lease: str | None,
+    date_format: str | None,
+    delimiter: str,
+    time_zone: tzinfo,
+) -> HistoryImport:
+    """Read the daily closing readings per lease from a CSV file.
+
+    Rows are assigned to ``default_lease`` if given, otherwise to the lease
+    named in the lease column (looked up in ``leases`` by lower case entry
+    ID or name).
+    """
+    result = HistoryImport()
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        try:
+            header = [column.strip().lower() for column in next(reader)]
+        except StopIteration:
+            raise HistoryImportError("the file is empty") from None
+
+        columns = [date_column, km_column]
+        if default_lease is None:
+            columns.append(lease_column)
+        if missing := [column for column in columns if column.lower() not in header]:
+            raise HistoryImportError(f"missing column(s) {', '.join(missing)}")
+        date_index = header.index(date_column.lower())
+        km_index = header.index(km_column.lower())
+        lease_index = (
+            header.index(lease_column.lower()) if default_lease is None else None
+        )
+
+        for row in reader:
+            result.rows += 1
+            if not result.rows % PROGRESS_ROWS:
+                _LOGGER.info("Read %s rows of %s", result.rows, path)
+            if not row:
+                continue
+
+            if lease_index is None:
+                entry_id = default_lease
+            elif (
+                entry_id := leases.get(_cell(row, lease_index).lower())
+            ) is None:
+                result.unknown_lease_rows += 1
+                result.add_error(
+                    f"Line {reader.line_num}: unknown lease"
+                    f" {_cell(row, lease_index)!r}"
+                )
+                continue
+
+            try:
+                day = _parse_day(_cell(row, date_index), date_format, time_zone)
+                km = _parse_km(_cell(row, km_index))
+            except ValueError as err:
+                result.invalid_rows += 1
+                result.add_error(f"Line {reader.line_num}: {err}")
+                continue
+
+            days = result.days.setdefault(entry_id, {})
+            ordinal = day.toordinal()
+            if km > days.get(ordinal, float("-inf")):
+                days[ordinal] = km
+
+    return result
+
+
+def _cell(row: list[str], index: int) -> str:
+    """Return a stripped cell of a row, empty if the row is too short."""
+    return row[index].strip() if index < len(row) else ""
+
+
+def _parse_day(value: str, date_format: str | None, time_zone: tzinfo) -> date:
+    """Return the local day of a date or timestamp."""
+    if not value:
+        raise ValueError("missing date")
+    parsed = (
+        datetime.strptime(value, date_format)
+        if date_format
+        else datetime.fromisoformat(value)
+    )
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(time_zone)
+    return parsed.date()
+
+
+def _parse_km(value: str) -> float:
+    """Return a reading, accepting a decimal comma."""
+    value = value.replace(" ", "")
+    if "," in value and "." not in value:
+        value = value.replace(",", ".")
+    km = float(value)
+    if km < 0 or not math.isfinite(km):
+        raise ValueError(f"invalid reading {value!r}")
+    return km
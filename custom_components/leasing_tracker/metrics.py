@@ -0,0 +1,65 @@
+"""Runtime metrics for Leasing Tracker."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+# Anzahl der Messwerte für die Latenz-Perzentile
+LATENCY_SAMPLES = 256
+
+
+class LeaseMetrics:
+    """Counters and calculation latencies of a lease."""
+
+    __slots__ = (
+        "calculations",
+        "coalesced_events",
+        "dropped_events",
+        "last_rollover",
+        "odometer_events",
+        "skipped_writes",
+        "state_writes",
+        "_latencies",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.calculations = 0
+        self.odometer_events = 0
+        self.dropped_events = 0
+        self.coalesced_events = 0
+        self.state_writes = 0
+        self.skipped_writes = 0
+        self.last_rollover: datetime | None = None
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def record_calculation(self, duration: float) -> None:
+        """Count a calculation and its duration in seconds."""
+        self.calculations += 1
+        self._latencies.append(duration)
+
+    def latency(self, percentile: float) -> float | None:
+        """Return a percentile of the recent calculation latencies in seconds."""
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as dict."""
+        p50 = self.latency(50)
+        p99 = self.latency(99)
+        return {
+            "calculations": self.calculations,
+            "odometer_events": self.odometer_events,
+            "dropped_events": self.dropped_events,
+            "coalesced_events": self.coalesced_events,
+            "state_writes": self.state_writes,
+            "skipped_writes": self.skipped_writes,
+            "calculation_latency_p50_ms": None if p50 is None else round(p50 * 1000, 3),
+            "calculation_latency_p99_ms": None if p99 is None else round(p99 * 1000, 3),
+            "last_rollover": (
+                None if self.last_rollover is None else self.last_rollover.isoformat()
+            ),
+        }
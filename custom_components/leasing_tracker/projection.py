@@ -0,0 +1,137 @@
+"""Monte Carlo projection of the mileage at the end of a lease.
+
+The distance still to be driven is simulated by resampling the recorded
+usage of the lease: every path draws whole weeks (sums of seven recorded
+days, which keeps the weekday pattern) until the end of the lease. With
+NumPy all paths of a lease are drawn in one array operation, otherwise the
+sum of the drawn weeks is approximated by a normal distribution.
+
+``project_batch`` is CPU bound and runs in an executor.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date
+from statistics import NormalDist, fmean, pvariance
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from .history import OdometerHistory
+
+# Simulierte Verläufe pro Leasing
+PATHS = 10_000
+# Berücksichtigte abgeschlossene Tage
+SAMPLE_DAYS = 364
+# Mindestens vier volle Wochen
+MIN_SAMPLE_DAYS = 28
+BLOCK_DAYS = 7
+PERCENTILES = (10, 50, 90)
+
+
+def daily_distances(history: OdometerHistory, today: date) -> list[float]:
+    """Return the distances of the recorded days completed before today."""
+    end = today.toordinal() - history.first_day
+    if end <= 1:
+        return []
+    readings = history.readings[max(0, end - SAMPLE_DAYS - 1) : end]
+    return [max(0.0, b - a) for a, b in zip(readings, readings[1:])]
+
+
+def project_batch(
+    distances: Sequence[Sequence[float]],
+    km_driven: Sequence[float],
+    remaining_days: Sequence[int],
+    allowed_km: Sequence[float],
+    seeds: Sequence[int],
+) -> list[dict[str, Any] | None]:
+    """Project the mileage at the end of many leases.
+
+    Returns per lease the 10th, 50th and 90th percentile of the KM driven
+    at the end of the lease and the probability (in %) of exceeding the
+    allowed KM, or None without enough recorded days.
+    """
+    project = _project_numpy if np is not None else _project_normal
+    return [
+        project(sample, driven, days, allowed, seed)
+        if len(sample) >= MIN_SAMPLE_DAYS
+        else None
+        for sample, driven, days, allowed, seed in zip(
+            distances, km_driven, remaining_days, allowed_km, seeds
+        )
+    ]
+
+
+def _weeks(sample: Sequence[float]) -> list[float]:
+    """Return the sums of the complete weeks, most recent day last."""
+    offset = len(sample) % BLOCK_DAYS
+    return [
+        sum(sample[index : index + BLOCK_DAYS])
+        for index in range(offset, len(sample), BLOCK_DAYS)
+    ]
+
+
+def _result(
+    percentiles: Sequence[float], exceed_probability: float
+) -> dict[str, Any]:
+    """Return the projection as sensor attributes."""
+    return {
+        **{
+            f"projected_km_p{percentile}": int(round(value))
+            for percentile, value in zip(PERCENTILES, percentiles)
+        },
+        "exceed_probability": round(exceed_probability * 100, 1),
+    }
+
+
+def _project_numpy(
+    sample: Sequence[float],
+    km_driven: float,
+    remaining_days: int,
+    allowed_km: float,
+    seed: int,
+) -> dict[str, Any]:
+    """Simulate all paths of a lease at once."""
+    rng = np.random.default_rng(seed)
+    weeks = np.asarray(_weeks(sample))
+    full_weeks, rest_days = divmod(max(0, remaining_days), BLOCK_DAYS)
+
+    # Wie oft jede Woche gezogen wird: eine Zeile pro Verlauf
+    counts = rng.multinomial(
+        full_weeks, np.full(len(weeks), 1 / len(weeks)), size=PATHS
+    )
+    totals = km_driven + counts @ weeks
+    if rest_days:
+        days = np.asarray(sample)
+        totals += rng.choice(days, size=(PATHS, rest_days)).sum(axis=1)
+
+    return _result(
+        np.percentile(totals, PERCENTILES).tolist(),
+        float(np.count_nonzero(totals > allowed_km)) / PATHS,
+    )
+
+
+def _project_normal(
+    sample: Sequence[float],
+    km_driven: float,
+    remaining_days: int,
+    allowed_km: float,
+    seed: int,
+) -> dict[str, Any]:
+    """Approximate the projection without NumPy."""
+    weeks = _weeks(sample)
+    full_weeks, rest_days = divmod(max(0, remaining_days), BLOCK_DAYS)
+    mean = km_driven + full_weeks * fmean(weeks) + rest_days * fmean(sample)
+    variance = full_weeks * pvariance(weeks) + rest_days * pvariance(sample)
+    if variance <= 0:
+        return _result([mean] * len(PERCENTILES), float(mean > allowed_km))
+
+    distribution = NormalDist(mean, variance**0.5)
+    return _result(
+        [distribution.inv_cdf(percentile / 100) for percentile in PERCENTILES],
+        1 - distribution.cdf(allowed_km),
+    )
@@ -0,0 +1,107 @@
+"""Long-term statistics of the distance driven for Leasing Tracker."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfLength
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .calculation import DAYS_PER_YEAR
+from .const import CONF_NAME, DOMAIN, UNIT_MILES
+from .coordinator import start_of_today
+
+if TYPE_CHECKING:
+    from .coordinator import LeasingTrackerCoordinator
+
+
+def statistic_ids(entry_id: str) -> tuple[str, str]:
+    """Return the IDs of the distance driven and the allowed distance."""
+    object_id = entry_id.lower()
+    return f"{DOMAIN}:{object_id}_km_driven", f"{DOMAIN}:{object_id}_km_allowed"
+
+
+@callback
+def async_publish_statistics(
+    hass: HomeAssistant, coordinators: Iterable[LeasingTrackerCoordinator]
+) -> None:
+    """Add the completed days of the odometer history to the statistics.
+
+    Every day becomes one row in its last hour, with the distance driven
+    since the start of the lease (and the distance allowed up to that day)
+    as cumulative sum, so statistics graphs show the distance per day,
+    week or month as change of the sum. Only days after the last published
+    day are added.
+    """
+    if "recorder" not in hass.config.components:
+        return
+
+    yesterday = start_of_today().date() - timedelta(days=1)
+    for coordinator in coordinators:
+        history = coordinator.history
+        if not history:
+            continue
+
+        params = coordinator.params
+        first_day = max(params.start_date.date(), date.fromordinal(history.first_day))
+        if (until := coordinator.statistics_until) is not None:
+            first_day = max(first_day, until + timedelta(days=1))
+        last_day = min(yesterday, params.end_date.date())
+        if first_day > last_day:
+            continue
+
+        # Erlaubte KM wie in calculate_dates
+        total_days = (params.end_date - params.start_date).days
+        allowed_km_total = int(params.km_per_year * (total_days / DAYS_PER_YEAR))
+
+        driven: list[StatisticData] = []
+        allowed: list[StatisticData] = []
+        day = first_day
+        while day <= last_day:
+            next_day = day + timedelta(days=1)
+            start = dt_util.start_of_local_day(next_day) - timedelta(hours=1)
+            km = history.closing(day) - params.start_km
+            driven.append(StatisticData(start=start, state=km, sum=km))
+            days_passed = (next_day - params.start_date.date()).days
+            km = int((allowed_km_total / total_days) * days_passed)
+            allowed.append(StatisticData(start=start, state=km, sum=km))
+            day = next_day
+
+        name = coordinator.config[CONF_NAME]
+        unit = (
+            UnitOfLength.MILES
+            if coordinator.distance_unit == UNIT_MILES
+            else UnitOfLength.KILOMETERS
+        )
+        driven_id, allowed_id = statistic_ids(coordinator.entry_id)
+        for statistic_id, statistic_name, rows in (
+            (driven_id, f"{name} distance driven", driven),
+            (allowed_id, f"{name} distance allowed", allowed),
+        ):
+            async_add_external_statistics(
+                hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=statistic_name,
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=unit,
+                ),
+                rows,
+            )
+
+        coordinator.statistics_until = last_day
+        coordinator.async_schedule_save()
+
+
+@callback
+def async_clear_statistics(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the statistics of a removed lease."""
+    if "recorder" in hass.config.components:
+        get_instance(hass).async_clear_statistics(list(statistic_ids(entry_id)))
@@ -1,31 +1,49 @@
 """Sensor platform for Leasing Tracker."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from collections.abc import Mapping
+from dataclasses import dataclass
 import logging
 from typing import Any
 
 from homeassistant.components.sensor import (
+    DOMAIN as SENSOR_DOMAIN,
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfLength
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfLength
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     CONF_CURRENT_KM_ENTITY,
     CONF_DISTANCE_UNIT,
     CONF_END_DATE,
+    CONF_ENTRY_TYPE,
     CONF_KM_PER_YEAR,
     CONF_NAME,
+    CONF_SENSOR_GROUPS,
     CONF_START_DATE,
     CONF_START_KM,
+    DATA_FLEET,
+    DEFAULT_SENSOR_GROUPS,
     DOMAIN,
+    ENTRY_TYPE_FLEET,
+    SENSOR_GROUP_MONTH_ACTUAL,
+    SENSOR_GROUP_MONTH_ESTIMATED,
+    SENSOR_GROUP_STATUS,
+    SENSOR_GROUP_TIME,
+    SENSOR_GROUP_TOTAL,
+    SENSOR_GROUP_YEAR_ACTUAL,
+    SENSOR_GROUP_YEAR_ESTIMATED,
+    STATUS_OPTIONS,
     UNIT_KILOMETERS,
     UNIT_MILES,
     SENSOR_ALLOWED_KM_PER_MONTH,
@@ -35,11 +53,18 @@ from .const import (
     SENSOR_DAYS_TOTAL,
     SENSOR_ESTIMATED_KM_MONTH_END,
     SENSOR_ESTIMATED_KM_YEAR_END,
+    SENSOR_FLEET_LEASES_ABOVE_PLAN,
+    SENSOR_FLEET_LEASES_BELOW_PLAN,
+    SENSOR_FLEET_LEASES_FAR_ABOVE_PLAN,
+    SENSOR_FLEET_LEASES_ON_TRACK,
+    SENSOR_FLEET_REMAINING_KM_TOTAL,
+    SENSOR_FLEET_WORST_KM_DIFFERENCE,
     SENSOR_KM_DIFFERENCE,
     SENSOR_KM_DRIVEN_THIS_MONTH,
     SENSOR_KM_DRIVEN_THIS_YEAR,
     SENSOR_KM_PER_DAY_AVERAGE,
     SENSOR_KM_PER_MONTH_AVERAGE,
+    SENSOR_METRICS,
     SENSOR_PROGRESS_PERCENTAGE,
     SENSOR_REMAINING_DAYS,
     SENSOR_REMAINING_KM_MONTH,
@@ -51,9 +76,227 @@ from .const import (
     SENSOR_STATUS,
     SENSOR_TOTAL_KM_DRIVEN,
 )
+from .coordinator import LeasingTrackerCoordinator
+from .fleet import LeasingFleet
 
 _LOGGER = logging.getLogger(__name__)
 
+# Die Vertragsdaten stehen nur als Attribute am Status-Sensor (oder, falls
+# dieser abgewählt ist, am ersten Sensor des Leasings)
+CONTRACT_ATTRIBUTES_SENSOR = SENSOR_STATUS
+
+
+@dataclass(frozen=True, kw_only=True)
+class LeasingTrackerSensorEntityDescription(SensorEntityDescription):
+    """Description of a Leasing Tracker sensor."""
+
+    group: str
+    # Einheit folgt der gewählten Distanzeinheit (km oder mi)
+    distance: bool = False
+    # Kleinere Änderungen werden nicht geschrieben
+    significance: float = 0
+    # Monte-Carlo-Prognose zum Leasingende als Attribute
+    projection: bool = False
+
+
+SENSOR_DESCRIPTIONS: tuple[LeasingTrackerSensorEntityDescription, ...] = (
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_KM_TOTAL,
+        translation_key=SENSOR_REMAINING_KM_TOTAL,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:counter",
+        distance=True,
+        projection=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_KM_YEAR,
+        translation_key=SENSOR_REMAINING_KM_YEAR,
+        group=SENSOR_GROUP_YEAR_ESTIMATED,
+        icon="mdi:calendar-clock",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_KM_MONTH,
+        translation_key=SENSOR_REMAINING_KM_MONTH,
+        group=SENSOR_GROUP_MONTH_ESTIMATED,
+        icon="mdi:calendar-month",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_KM_YEAR_ACTUAL,
+        translation_key=SENSOR_REMAINING_KM_YEAR_ACTUAL,
+        group=SENSOR_GROUP_YEAR_ACTUAL,
+        icon="mdi:calendar-today",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_KM_MONTH_ACTUAL,
+        translation_key=SENSOR_REMAINING_KM_MONTH_ACTUAL,
+        group=SENSOR_GROUP_MONTH_ACTUAL,
+        icon="mdi:calendar-month-outline",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ESTIMATED_KM_YEAR_END,
+        translation_key=SENSOR_ESTIMATED_KM_YEAR_END,
+        group=SENSOR_GROUP_YEAR_ESTIMATED,
+        icon="mdi:chart-timeline-variant",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ESTIMATED_KM_MONTH_END,
+        translation_key=SENSOR_ESTIMATED_KM_MONTH_END,
+        group=SENSOR_GROUP_MONTH_ESTIMATED,
+        icon="mdi:chart-bell-curve",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_DAYS,
+        translation_key=SENSOR_REMAINING_DAYS,
+        group=SENSOR_GROUP_TIME,
+        icon="mdi:calendar-end",
+        native_unit_of_measurement="d",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_REMAINING_MONTHS,
+        translation_key=SENSOR_REMAINING_MONTHS,
+        group=SENSOR_GROUP_TIME,
+        icon="mdi:calendar-range",
+        native_unit_of_measurement="mo",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_TOTAL_KM_DRIVEN,
+        translation_key=SENSOR_TOTAL_KM_DRIVEN,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:speedometer",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_KM_DRIVEN_THIS_MONTH,
+        translation_key=SENSOR_KM_DRIVEN_THIS_MONTH,
+        group=SENSOR_GROUP_MONTH_ACTUAL,
+        icon="mdi:calendar-check",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_KM_DRIVEN_THIS_YEAR,
+        translation_key=SENSOR_KM_DRIVEN_THIS_YEAR,
+        group=SENSOR_GROUP_YEAR_ACTUAL,
+        icon="mdi:calendar-star",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_KM_PER_DAY_AVERAGE,
+        translation_key=SENSOR_KM_PER_DAY_AVERAGE,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:chart-line",
+        distance=True,
+        state_class=SensorStateClass.MEASUREMENT,
+        significance=0.1,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_KM_PER_MONTH_AVERAGE,
+        translation_key=SENSOR_KM_PER_MONTH_AVERAGE,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:chart-bar",
+        distance=True,
+        state_class=SensorStateClass.MEASUREMENT,
+        significance=1,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ALLOWED_KM_TOTAL,
+        translation_key=SENSOR_ALLOWED_KM_TOTAL,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:car-info",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ALLOWED_KM_PER_MONTH,
+        translation_key=SENSOR_ALLOWED_KM_PER_MONTH,
+        group=SENSOR_GROUP_TOTAL,
+        icon="mdi:calendar-check",
+        distance=True,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ALLOWED_KM_THIS_YEAR,
+        translation_key=SENSOR_ALLOWED_KM_THIS_YEAR,
+        group=SENSOR_GROUP_YEAR_ACTUAL,
+        icon="mdi:calendar-text",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_ALLOWED_KM_THIS_MONTH,
+        translation_key=SENSOR_ALLOWED_KM_THIS_MONTH,
+        group=SENSOR_GROUP_MONTH_ACTUAL,
+        icon="mdi:calendar-outline",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_DAYS_TOTAL,
+        translation_key=SENSOR_DAYS_TOTAL,
+        group=SENSOR_GROUP_TIME,
+        icon="mdi:calendar-today",
+        native_unit_of_measurement="d",
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_PROGRESS_PERCENTAGE,
+        translation_key=SENSOR_PROGRESS_PERCENTAGE,
+        group=SENSOR_GROUP_TIME,
+        icon="mdi:progress-clock",
+        native_unit_of_measurement="%",
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_KM_DIFFERENCE,
+        translation_key=SENSOR_KM_DIFFERENCE,
+        group=SENSOR_GROUP_STATUS,
+        icon="mdi:delta",
+        distance=True,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LeasingTrackerSensorEntityDescription(
+        key=SENSOR_STATUS,
+        translation_key=SENSOR_STATUS,
+        group=SENSOR_GROUP_STATUS,
+        icon="mdi:information",
+        device_class=SensorDeviceClass.ENUM,
+        options=STATUS_OPTIONS,
+    ),
+)
+
+# Anzahl der Leasings je Status
+FLEET_STATUS_SENSORS = {
+    SENSOR_FLEET_LEASES_FAR_ABOVE_PLAN: "far_above_plan",
+    SENSOR_FLEET_LEASES_ABOVE_PLAN: "above_plan",
+    SENSOR_FLEET_LEASES_ON_TRACK: "on_track",
+    SENSOR_FLEET_LEASES_BELOW_PLAN: "below_plan",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -61,456 +304,297 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Leasing Tracker sensors."""
-    config = entry.data
-    name = config[CONF_NAME]
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        fleet: LeasingFleet = hass.data[DATA_FLEET]
+        async_add_entities(
+            LeasingFleetSensor(fleet, entry, sensor_type)
+            for sensor_type in (
+                SENSOR_FLEET_REMAINING_KM_TOTAL,
+                *FLEET_STATUS_SENSORS,
+                SENSOR_FLEET_WORST_KM_DIFFERENCE,
+            )
+        )
+        return
 
+    coordinator: LeasingTrackerCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.data[CONF_NAME],
+        manufacturer="Leasing Tracker",
+        model="Car Leasing Monitor",
+    )
+    groups = set(entry.data.get(CONF_SENSOR_GROUPS, DEFAULT_SENSOR_GROUPS))
     sensors = [
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_KM_TOTAL),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_KM_YEAR),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_KM_MONTH),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_KM_YEAR_ACTUAL),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_KM_MONTH_ACTUAL),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ESTIMATED_KM_YEAR_END),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ESTIMATED_KM_MONTH_END),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_DAYS),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_REMAINING_MONTHS),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_TOTAL_KM_DRIVEN),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_KM_DRIVEN_THIS_MONTH),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_KM_DRIVEN_THIS_YEAR),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_KM_PER_DAY_AVERAGE),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_KM_PER_MONTH_AVERAGE),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ALLOWED_KM_TOTAL),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ALLOWED_KM_PER_MONTH),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ALLOWED_KM_THIS_YEAR),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_ALLOWED_KM_THIS_MONTH),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_DAYS_TOTAL),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_PROGRESS_PERCENTAGE),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_KM_DIFFERENCE),
-        LeasingTrackerSensor(hass, entry, name, SENSOR_STATUS),
+        LeasingTrackerSensor(coordinator, entry, device_info, description)
+        for description in SENSOR_DESCRIPTIONS
+        if description.group in groups
     ]
 
-    async_add_entities(sensors, True)
+    # Sensoren abgewählter Gruppen aus der Registry entfernen
+    if len(sensors) < len(SENSOR_DESCRIPTIONS):
+        entity_registry = er.async_get(hass)
+        for description in SENSOR_DESCRIPTIONS:
+            if description.group not in groups and (
+                entity_id := entity_registry.async_get_entity_id(
+                    SENSOR_DOMAIN, DOMAIN, f"{entry.entry_id}_{description.key}"
+                )
+            ):
+                entity_registry.async_remove(entity_id)
+
+    if sensors:
+        contract_sensor = next(
+            (
+                sensor
+                for sensor in sensors
+                if sensor.entity_description.key == CONTRACT_ATTRIBUTES_SENSOR
+            ),
+            sensors[0],
+        )
+        contract_sensor.set_contract_attributes()
+
+    async_add_entities(
+        [*sensors, LeasingTrackerMetricsSensor(coordinator, entry, device_info)]
+    )
+
+
+class LeasingTrackerSensor(
+    CoordinatorEntity[LeasingTrackerCoordinator], RestoreSensor
+):
+    """Representation of a Leasing Tracker Sensor.
+
+    Without any KM reading yet (neither from the current KM entity nor from
+    the stored history) the last value from before the restart is restored.
+    """
+
+    # Kein __slots__: Entities von HA benötigen ein __dict__ (u.a. für cached_property)
+    _attr_has_entity_name = True
+    _unrecorded_attributes = frozenset(
+        {"start_date", "end_date", "start_km", "km_per_year", "current_km_entity"}
+    )
+
+    entity_description: LeasingTrackerSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: LeasingTrackerCoordinator,
+        entry: ConfigEntry,
+        device_info: DeviceInfo,
+        description: LeasingTrackerSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info
+        self._has_contract_attributes = False
+        self._projection = (
+            coordinator.projection if description.projection else None
+        )
+        self._apply_config(coordinator.config)
+
+        self._attr_native_value = coordinator.data.get(description.key)
+        self._published_available = coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value if there is nothing calculated yet."""
+        await super().async_added_to_hass()
+        if (
+            not self.coordinator.data
+            and (last_sensor_data := await self.async_get_last_sensor_data())
+        ):
+            self._attr_native_value = last_sensor_data.native_value
+
+    def set_contract_attributes(self) -> None:
+        """Expose the (static) contract data of the lease as attributes."""
+        self._has_contract_attributes = True
+        self._apply_config(self._config)
+
+    def _apply_config(self, config: Mapping[str, Any]) -> None:
+        """Take over the unit and contract data of the configuration."""
+        self._config = config
+        if self.entity_description.distance:
+            self._attr_native_unit_of_measurement = (
+                UnitOfLength.MILES
+                if config.get(CONF_DISTANCE_UNIT, UNIT_MILES) == UNIT_MILES
+                else UnitOfLength.KILOMETERS
+            )
+        self._update_attributes()
+
+    def _update_attributes(self) -> None:
+        """Combine the contract data and the projection to the attributes."""
+        attributes: dict[str, Any] = {}
+        if self._has_contract_attributes:
+            config = self._config
+            attributes.update(
+                start_date=config[CONF_START_DATE],
+                end_date=config[CONF_END_DATE],
+                start_km=config[CONF_START_KM],
+                km_per_year=config[CONF_KM_PER_YEAR],
+                current_km_entity=config[CONF_CURRENT_KM_ENTITY],
+            )
+        if self._projection is not None:
+            attributes.update(self._projection)
+        self._attr_extra_state_attributes = attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take over the values calculated by the coordinator.
+
+        The state is only written if the value (or the availability) changed
+        by at least the significance threshold of the sensor, or if the
+        options of the lease or its projection changed.
+        """
+        if data := self.coordinator.data:
+            value = data.get(self.entity_description.key)
+        else:
+            # Ohne KM-Stand den letzten (ggf. wiederhergestellten) Wert behalten
+            value = self._attr_native_value
+        available = self.available
+        metrics = self.coordinator.metrics
+        changed = False
+        if (config := self.coordinator.config) is not self._config:
+            self._apply_config(config)
+            changed = True
+        if (
+            self.entity_description.projection
+            and (projection := self.coordinator.projection) is not self._projection
+        ):
+            self._projection = projection
+            self._update_attributes()
+            changed = True
+        if (
+            not changed
+            and available == self._published_available
+            and not self._is_significant(self._attr_native_value, value)
+        ):
+            metrics.skipped_writes += 1
+            return
+
+        self._attr_native_value = value
+        self._published_available = available
+        metrics.state_writes += 1
+        self.async_write_ha_state()
+
+    def _is_significant(self, old: Any, new: Any) -> bool:
+        """Return True if the change from old to new should be published."""
+        if old == new:
+            return False
+        significance = self.entity_description.significance
+        if (
+            not significance
+            or not isinstance(old, (int, float))
+            or not isinstance(new, (int, float))
+        ):
+            return True
+        return abs(new - old) >= significance
+
+
+class LeasingTrackerMetricsSensor(
+    CoordinatorEntity[LeasingTrackerCoordinator], SensorEntity
+):
+    """Diagnostic sensor with the runtime metrics of a lease."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = SENSOR_METRICS
+    _attr_icon = "mdi:chart-box-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(
+        self,
+        coordinator: LeasingTrackerCoordinator,
+        entry: ConfigEntry,
+        device_info: DeviceInfo,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_{SENSOR_METRICS}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of calculations."""
+        return self.coordinator.metrics.calculations
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the remaining metrics."""
+        return self.coordinator.metrics.as_dict()
 
 
-class LeasingTrackerSensor(SensorEntity):
-    """Representation of a Leasing Tracker Sensor."""
+class LeasingFleetSensor(SensorEntity):
+    """Sensor summarizing all leases of the fleet."""
 
     _attr_has_entity_name = True
-    _attr_should_poll = True
+    _attr_should_poll = False
 
     def __init__(
         self,
-        hass: HomeAssistant,
+        fleet: LeasingFleet,
         entry: ConfigEntry,
-        name: str,
         sensor_type: str,
     ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._entry = entry
-        self._config = entry.data
+        self._fleet = fleet
         self._sensor_type = sensor_type
         self._attr_unique_id = f"{entry.entry_id}_{sensor_type}"
         self._attr_translation_key = sensor_type
-        self._current_km_entity = self._config[CONF_CURRENT_KM_ENTITY]
-        self._distance_unit = self._config.get(CONF_DISTANCE_UNIT, UNIT_MILES)
-        
-        # Device Info
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_extra_state_attributes = {}
+
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
-            name=name,
+            name=entry.title,
             manufacturer="Leasing Tracker",
-            model="Car Leasing Monitor",
+            model="Leasing Fleet",
         )
 
-        # Sensor-spezifische Attribute
-        self._setup_sensor_attributes()
-
-    def _setup_sensor_attributes(self) -> None:
-        """Set up sensor-specific attributes."""
-        sensor_configs = {
-            SENSOR_REMAINING_KM_TOTAL: {
-                "icon": "mdi:counter",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_REMAINING_KM_YEAR: {
-                "icon": "mdi:calendar-clock",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_REMAINING_KM_MONTH: {
-                "icon": "mdi:calendar-month",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_REMAINING_KM_YEAR_ACTUAL: {
-                "icon": "mdi:calendar-today",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_REMAINING_KM_MONTH_ACTUAL: {
-                "icon": "mdi:calendar-month-outline",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_ESTIMATED_KM_YEAR_END: {
-                "icon": "mdi:chart-timeline-variant",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_ESTIMATED_KM_MONTH_END: {
-                "icon": "mdi:chart-bell-curve",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_REMAINING_DAYS: {
-                "icon": "mdi:calendar-end",
-                "unit": "d",
-                "state_class": SensorStateClass.MEASUREMENT,
-            },
-            SENSOR_REMAINING_MONTHS: {
-                "icon": "mdi:calendar-range",
-                "unit": "mo",
-                "state_class": SensorStateClass.MEASUREMENT,
-            },
-            SENSOR_TOTAL_KM_DRIVEN: {
-                "icon": "mdi:speedometer",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.TOTAL_INCREASING,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_KM_DRIVEN_THIS_MONTH: {
-                "icon": "mdi:calendar-check",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_KM_DRIVEN_THIS_YEAR: {
-                "icon": "mdi:calendar-star",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_KM_PER_DAY_AVERAGE: {
-                "icon": "mdi:chart-line",
-                "unit": "distance",
-                "state_class": SensorStateClass.MEASUREMENT,
-            },
-            SENSOR_KM_PER_MONTH_AVERAGE: {
-                "icon": "mdi:chart-bar",
-                "unit": "distance",
-                "state_class": SensorStateClass.MEASUREMENT,
-            },
-            SENSOR_ALLOWED_KM_TOTAL: {
-                "icon": "mdi:car-info",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_ALLOWED_KM_PER_MONTH: {
-                "icon": "mdi:calendar-check",
-                "unit": "distance",
-            },
-            SENSOR_ALLOWED_KM_THIS_YEAR: {
-                "icon": "mdi:calendar-text",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_ALLOWED_KM_THIS_MONTH: {
-                "icon": "mdi:calendar-outline",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_DAYS_TOTAL: {
-                "icon": "mdi:calendar-today",
-                "unit": "d",
-            },
-            SENSOR_PROGRESS_PERCENTAGE: {
-                "icon": "mdi:progress-clock",
-                "unit": "%",
-            },
-            SENSOR_KM_DIFFERENCE: {
-                "icon": "mdi:delta",
-                "unit": "distance",
-                "device_class": SensorDeviceClass.DISTANCE,
-                "state_class": SensorStateClass.MEASUREMENT,
-                "suggested_unit": UnitOfLength.MILES,
-            },
-            SENSOR_STATUS: {
-                "icon": "mdi:information",
-                "device_class": SensorDeviceClass.ENUM,
-                "options": [
-                    "far_above_plan",
-                    "above_plan",
-                    "on_track",
-                    "below_plan",
-                ],
-            },
-        }
-
-        config = sensor_configs.get(self._sensor_type, {})
-        self._attr_icon = config.get("icon")
-
-        self._attr_native_unit_of_measurement = self._resolve_unit(config.get("unit"))
-        if "device_class" in config:
-            self._attr_device_class = config["device_class"]
-        if "state_class" in config:
-            self._attr_state_class = config["state_class"]
-        if "options" in config:
-            self._attr_options = config["options"]
-
-    def _resolve_unit(self, unit_type: str | None) -> str | None:
-        """Resolve displayed unit from selected distance unit."""
-        if unit_type == "distance":
-            return UnitOfLength.MILES if self._distance_unit == UNIT_MILES else UnitOfLength.KILOMETERS
-        return unit_type
+        if sensor_type in FLEET_STATUS_SENSORS:
+            self._attr_icon = "mdi:car-multiple"
+        else:
+            self._attr_icon = (
+                "mdi:counter"
+                if sensor_type == SENSOR_FLEET_REMAINING_KM_TOTAL
+                else "mdi:delta"
+            )
+            self._attr_device_class = SensorDeviceClass.DISTANCE
+            self._attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-        @callback
-        def sensor_state_listener(event):
-            """Handle state changes of the current KM entity."""
-            self.async_schedule_update_ha_state(True)
-
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, [self._current_km_entity], sensor_state_listener
-            )
-        )
+        self._update_value()
+        self.async_on_remove(self._fleet.async_add_listener(self._handle_fleet_update))
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return additional state attributes."""
-        calculations = self._calculate_values()
-        
-        return {
-            "start_date": self._config[CONF_START_DATE],
-            "end_date": self._config[CONF_END_DATE],
-            "start_km": self._config[CONF_START_KM],
-            "km_per_year": self._config[CONF_KM_PER_YEAR],
-            "current_km_entity": self._current_km_entity,
-        }
-
-    def _get_current_km(self) -> float | None:
-        """Get current KM from entity."""
-        state = self.hass.states.get(self._current_km_entity)
-        if state is None or state.state in ["unknown", "unavailable"]:
-            return None
-        
-        try:
-            return float(state.state)
-        except (ValueError, TypeError):
-            _LOGGER.warning(
-                "Could not convert current KM state to float: %s", state.state
-            )
-            return None
-
-    def _calculate_values(self) -> dict[str, Any]:
-        """Calculate all leasing values."""
-        current_km = self._get_current_km()
-        if current_km is None:
-            return {}
-
-        # Datumswerte parsen
-        start_date = datetime.fromisoformat(self._config[CONF_START_DATE])
-        end_date = datetime.fromisoformat(self._config[CONF_END_DATE])
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Basisdaten
-        start_km = self._config[CONF_START_KM]
-        km_per_year = self._config[CONF_KM_PER_YEAR]
-        
-        # Zeitberechnungen
-        total_days = (end_date - start_date).days
-        days_passed = (today - start_date).days
-        remaining_days = (end_date - today).days
-        
-        # Monatliche Berechnungen
-        total_months = total_days / 30.44  # Durchschnittliche Tage pro Monat
-        months_passed = days_passed / 30.44
-        remaining_months = remaining_days / 30.44
-        
-        # Jahre Berechnungen
-        total_years = total_days / 365.25
-        years_passed = days_passed / 365.25
-        
-        # KM Berechnungen
-        allowed_km_total = int(km_per_year * total_years)
-        allowed_km_per_month = int(km_per_year / 12)
-        total_km_driven = int(current_km - start_km)
-        
-        # Durchschnittswerte
-        km_per_day_average = (
-            round(total_km_driven / days_passed, 2) if days_passed > 0 else 0
-        )
-        km_per_month_average = (
-            round(total_km_driven / months_passed, 2) if months_passed > 0 else 0
-        )
-        
-        # Sollwert KM basierend auf verstrichener Zeit
-        should_have_driven = int((allowed_km_total / total_days) * days_passed)
-        km_difference = total_km_driven - should_have_driven
-        
-        # Verbleibende KM gesamt
-        remaining_km_total = allowed_km_total - total_km_driven
-        
-        # ============================================
-        # JAHR-BERECHNUNGEN (aktuelles Kalenderjahr)
-        # ============================================
-        current_year_start = datetime(today.year, 1, 1)
-        if start_date > current_year_start:
-            current_year_start = start_date
-        
-        current_year_end = datetime(today.year, 12, 31)
-        if end_date < current_year_end:
-            current_year_end = end_date
-        
-        days_in_current_year = (current_year_end - current_year_start).days + 1
-        allowed_km_this_year = int((km_per_year / 365.25) * days_in_current_year)
-        
-        # Berechne den KM-Stand zu Jahresbeginn
-        # Wir nehmen an, dass der durchschnittliche Verbrauch konstant war
-        days_from_start_to_year_start = max(0, (current_year_start - start_date).days)
-        if days_from_start_to_year_start > 0 and days_passed > 0:
-            km_at_year_start = start_km + (total_km_driven / days_passed * days_from_start_to_year_start)
-        else:
-            km_at_year_start = start_km
-        
-        # Gefahrene KM in diesem Jahr
-        km_driven_this_year = int(current_km - km_at_year_start)
-        
-        # Tatsächlich verbleibende KM dieses Jahr (ohne Schätzung)
-        remaining_km_year_actual = allowed_km_this_year - km_driven_this_year
-        
-        # Geschätzte KM am Jahresende (basierend auf Durchschnitt)
-        days_passed_this_year = (today - current_year_start).days
-        days_remaining_this_year = (current_year_end - today).days
-        
-        if days_passed_this_year > 0 and km_per_day_average > 0:
-            estimated_km_year_end = int(km_driven_this_year + (km_per_day_average * days_remaining_this_year))
-            remaining_km_year_estimated = allowed_km_this_year - estimated_km_year_end
-        else:
-            estimated_km_year_end = km_driven_this_year
-            remaining_km_year_estimated = allowed_km_this_year
-        
-        # ============================================
-        # MONATS-BERECHNUNGEN (aktueller Monat)
-        # ============================================
-        current_month_start = datetime(today.year, today.month, 1)
-        
-        # Nächster Monat berechnen
-        if today.month < 12:
-            next_month_start = datetime(today.year, today.month + 1, 1)
-        else:
-            next_month_start = datetime(today.year + 1, 1, 1)
-        
-        days_in_month = (next_month_start - current_month_start).days
-        
-        # Erlaubte KM für diesen spezifischen Monat
-        # Berechne basierend auf dem durchschnittlichen Tagesbudget
-        daily_km_budget = km_per_year / 365.25
-        allowed_km_this_month = int(daily_km_budget * days_in_month)
-        
-        # Berechne den KM-Stand zu Monatsbeginn
-        days_from_start_to_month_start = max(0, (current_month_start - start_date).days)
-        if days_from_start_to_month_start > 0 and days_passed > 0:
-            km_at_month_start = start_km + (total_km_driven / days_passed * days_from_start_to_month_start)
-        else:
-            km_at_month_start = start_km if current_month_start <= start_date else current_km
-        
-        # Gefahrene KM in diesem Monat
-        km_driven_this_month = int(current_km - km_at_month_start)
-        
-        # Tatsächlich verbleibende KM diesen Monat (ohne Schätzung)
-        remaining_km_month_actual = allowed_km_this_month - km_driven_this_month
-        
-        # Geschätzte KM am Monatsende (basierend auf Durchschnitt)
-        days_passed_this_month = (today - current_month_start).days
-        days_remaining_this_month = (next_month_start - today).days
-        
-        if days_passed_this_month > 0 and km_per_day_average > 0:
-            estimated_km_month_end = int(km_driven_this_month + (km_per_day_average * days_remaining_this_month))
-            remaining_km_month_estimated = allowed_km_this_month - estimated_km_month_end
-        else:
-            estimated_km_month_end = km_driven_this_month
-            remaining_km_month_estimated = allowed_km_this_month
-        
-        # Fortschritt in Prozent
-        progress_percentage = round((days_passed / total_days) * 100, 1) if total_days > 0 else 0
-        
-        # Status ermitteln
-        if km_difference > allowed_km_per_month:
-            status = "far_above_plan"
-        elif km_difference > 0:
-            status = "above_plan"
-        elif km_difference > -allowed_km_per_month:
-            status = "on_track"
-        else:
-            status = "below_plan"
-
-        return {
-            # Gesamt
-            "remaining_km_total": max(0, remaining_km_total),
-            "total_km_driven": total_km_driven,
-            "allowed_km_total": allowed_km_total,
-            "allowed_km_per_month": allowed_km_per_month,
-            
-            # Jahr - Schätzungen
-            "remaining_km_year": remaining_km_year_estimated,
-            "estimated_km_year_end": estimated_km_year_end,
-            
-            # Jahr - Tatsächlich
-            "remaining_km_year_actual": remaining_km_year_actual,
-            "km_driven_this_year": km_driven_this_year,
-            "allowed_km_this_year": allowed_km_this_year,
-            
-            # Monat - Schätzungen
-            "remaining_km_month": remaining_km_month_estimated,
-            "estimated_km_month_end": estimated_km_month_end,
-            
-            # Monat - Tatsächlich
-            "remaining_km_month_actual": remaining_km_month_actual,
-            "km_driven_this_month": km_driven_this_month,
-            "allowed_km_this_month": allowed_km_this_month,
-            
-            # Zeit
-            "remaining_days": max(0, remaining_days),
-            "remaining_months": round(remaining_months, 1),
-            "days_total": total_days,
-            
-            # Durchschnitt & Status
-            "km_per_day_average": km_per_day_average,
-            "km_per_month_average": km_per_month_average,
-            "progress_percentage": progress_percentage,
-            "km_difference": km_difference,
-            "status": status,
-        }
-
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        calculations = self._calculate_values()
-        
-        if calculations:
-            self._attr_native_value = calculations.get(self._sensor_type)
+    @callback
+    def _handle_fleet_update(self) -> None:
+        """Take over the changed fleet totals."""
+        if self._update_value():
+            self.async_write_ha_state()
+
+    def _update_value(self) -> bool:
+        """Read the value from the fleet totals; return True if it changed."""
+        aggregates = self._fleet.aggregates
+        attributes = self._attr_extra_state_attributes
+        if self._sensor_type in FLEET_STATUS_SENSORS:
+            value = aggregates.status_counts[FLEET_STATUS_SENSORS[self._sensor_type]]
+        elif self._sensor_type == SENSOR_FLEET_REMAINING_KM_TOTAL:
+            value = round(aggregates.remaining_km_total)
+        elif (worst := aggregates.worst_km_difference) is None:
+            value = None
+            attributes = {}
         else:
-            self._attr_native_value = None
+            km_difference, entry_id = worst
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            value = round(km_difference)
+            attributes = {"lease": entry.title if entry else entry_id}
+
+        if (
+            value == self._attr_native_value
+            and attributes == self._attr_extra_state_attributes
+        ):
+            return False
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
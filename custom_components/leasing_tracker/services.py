@@ -0,0 +1,456 @@
+"""Services for Leasing Tracker."""
+from __future__ import annotations
+
+import asyncio
+import csv
+from datetime import date
+from functools import partial
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .batch import calculate_batch
+from .calculation import LeaseParameters
+from .const import (
+    CONF_CURRENT_KM_ENTITY,
+    CONF_DISTANCE_UNIT,
+    CONF_END_DATE,
+    CONF_ENTRY_TYPE,
+    CONF_EVENT_HYSTERESIS,
+    CONF_FORECAST_MODE,
+    CONF_KM_DIFFERENCE_THRESHOLD,
+    CONF_KM_PER_YEAR,
+    CONF_MIN_KM_DELTA,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_MONTH_BUDGET_THRESHOLD,
+    CONF_NAME,
+    CONF_SENSOR_GROUPS,
+    CONF_START_DATE,
+    CONF_START_KM,
+    DATA_FLEET,
+    DEFAULT_EVENT_HYSTERESIS,
+    DEFAULT_FORECAST_MODE,
+    DEFAULT_MIN_KM_DELTA,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    ENTRY_TYPE_FLEET,
+    FORECAST_MODES,
+    SENSOR_GROUPS,
+    UNIT_KILOMETERS,
+    UNIT_MILES,
+)
+from .config_flow import async_default_sensor_groups, lease_unique_id
+from .coordinator import LeasingTrackerCoordinator, start_of_today
+from .history_import import HistoryImportError, read_csv_history
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_UPDATE = "bulk_update"
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_SIMULATE = "simulate"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_LEASES = "leases"
+ATTR_FILE_PATH = "file_path"
+ATTR_DATE_COLUMN = "date_column"
+ATTR_KM_COLUMN = "km_column"
+ATTR_LEASE_COLUMN = "lease_column"
+ATTR_DATE_FORMAT = "date_format"
+ATTR_DELIMITER = "delimiter"
+ATTR_SCENARIOS = "scenarios"
+ATTR_LABEL = "label"
+
+# Pflichtfelder für neue Leasings
+REQUIRED_FOR_NEW = (
+    CONF_CURRENT_KM_ENTITY,
+    CONF_START_DATE,
+    CONF_END_DATE,
+    CONF_KM_PER_YEAR,
+)
+
+LEASE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(CONF_NAME): cv.string,
+            vol.Optional(CONF_CURRENT_KM_ENTITY): cv.entity_id,
+            vol.Optional(CONF_START_DATE): cv.date,
+            vol.Optional(CONF_END_DATE): cv.date,
+            vol.Optional(CONF_START_KM): cv.positive_int,
+            vol.Optional(CONF_KM_PER_YEAR): cv.positive_int,
+            vol.Optional(CONF_DISTANCE_UNIT): vol.In([UNIT_KILOMETERS, UNIT_MILES]),
+            vol.Optional(CONF_MIN_UPDATE_INTERVAL): cv.positive_int,
+            vol.Optional(CONF_MIN_KM_DELTA): cv.positive_float,
+            vol.Optional(CONF_SENSOR_GROUPS): vol.All(
+                cv.ensure_list, [vol.In(SENSOR_GROUPS)], vol.Length(min=1)
+            ),
+            vol.Optional(CONF_FORECAST_MODE): vol.In(FORECAST_MODES),
+            vol.Optional(CONF_KM_DIFFERENCE_THRESHOLD): vol.Any(None, vol.Coerce(int)),
+            vol.Optional(CONF_MONTH_BUDGET_THRESHOLD): vol.Any(None, vol.Coerce(int)),
+            vol.Optional(CONF_EVENT_HYSTERESIS): cv.positive_int,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTRY_ID, CONF_NAME),
+)
+
+BULK_UPDATE_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_LEASES): vol.All(cv.ensure_list, [LEASE_SCHEMA])}
+)
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_FILE_PATH): cv.string,
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DATE_COLUMN, default="date"): cv.string,
+        vol.Optional(ATTR_KM_COLUMN, default="km"): cv.string,
+        vol.Optional(ATTR_LEASE_COLUMN, default="lease"): cv.string,
+        vol.Optional(ATTR_DATE_FORMAT): cv.string,
+        vol.Optional(ATTR_DELIMITER, default=","): vol.All(
+            cv.string, vol.Length(min=1, max=1)
+        ),
+    }
+)
+
+
+SCENARIO_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(CONF_NAME): cv.string,
+            vol.Optional(ATTR_LABEL): cv.string,
+            vol.Optional(CONF_START_DATE): cv.date,
+            vol.Optional(CONF_END_DATE): cv.date,
+            vol.Optional(CONF_START_KM): cv.positive_int,
+            vol.Optional(CONF_KM_PER_YEAR): cv.positive_int,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTRY_ID, CONF_NAME),
+)
+
+SIMULATE_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_SCENARIOS): vol.All(cv.ensure_list, [SCENARIO_SCHEMA])}
+)
+
+# Vertragsdaten, die ein Szenario ändern kann
+SCENARIO_PARAMETERS = (CONF_START_DATE, CONF_END_DATE, CONF_START_KM, CONF_KM_PER_YEAR)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Leasing Tracker services."""
+
+    async def async_bulk_update(call: ServiceCall) -> ServiceResponse:
+        """Create or update many leases at once.
+
+        Leases are matched by entry ID or by their current name; several
+        items for the same lease are merged in order. All leases are
+        validated before anything is changed. Changed leases are
+        recalculated together in one batch by the fleet; only changes of the
+        KM entity or the sensor groups reload the entry.
+        """
+        entries = {
+            entry.entry_id: entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.data.get(CONF_ENTRY_TYPE) != ENTRY_TYPE_FLEET
+        }
+        by_name = {entry.data[CONF_NAME].lower(): entry for entry in entries.values()}
+
+        # Pro Leasing zusammengeführt, spätere Angaben überschreiben frühere
+        updates: dict[str, dict[str, Any]] = {}
+        new_leases: dict[str, dict[str, Any]] = {}
+        for lease in call.data[ATTR_LEASES]:
+            changes = {
+                key: value.isoformat() if isinstance(value, date) else value
+                for key, value in lease.items()
+                if key != ATTR_ENTRY_ID
+            }
+            if ATTR_ENTRY_ID in lease:
+                if (entry := entries.get(lease[ATTR_ENTRY_ID])) is None:
+                    raise ServiceValidationError(
+                        f"Unknown lease entry {lease[ATTR_ENTRY_ID]}"
+                    )
+            else:
+                entry = by_name.get(lease[CONF_NAME].lower())
+
+            if entry is not None:
+                updates[entry.entry_id] = {
+                    **updates.get(entry.entry_id, entry.data),
+                    **changes,
+                }
+            else:
+                name = lease[CONF_NAME].lower()
+                new_leases[name] = {**new_leases.get(name, {}), **changes}
+
+        for data in updates.values():
+            _validate_lease(data)
+
+        unique_ids = {entry.unique_id: entry for entry in entries.values()}
+        new_unique_ids: dict[str, str] = {}
+        default_sensor_groups = await async_default_sensor_groups(hass)
+        for name, changes in new_leases.items():
+            if missing := [key for key in REQUIRED_FOR_NEW if key not in changes]:
+                raise ServiceValidationError(
+                    f"New lease {changes[CONF_NAME]} is missing {', '.join(missing)}"
+                )
+            unique_id = lease_unique_id(name)
+            # Umbenannte Leasings behalten die ID ihres ursprünglichen Namens
+            if (entry := unique_ids.get(unique_id)) is not None:
+                raise ServiceValidationError(
+                    f"New lease {changes[CONF_NAME]} has the same ID as lease"
+                    f" {entry.title}, which was renamed"
+                )
+            # Z.B. "My Car" und "my_car"
+            if (other := new_unique_ids.get(unique_id)) is not None:
+                raise ServiceValidationError(
+                    f"New leases {other} and {changes[CONF_NAME]} would get the"
+                    f" same ID {unique_id}"
+                )
+            new_unique_ids[unique_id] = changes[CONF_NAME]
+            new_leases[name] = data = {
+                CONF_START_KM: 0,
+                CONF_DISTANCE_UNIT: UNIT_MILES,
+                CONF_MIN_UPDATE_INTERVAL: DEFAULT_MIN_UPDATE_INTERVAL,
+                CONF_MIN_KM_DELTA: DEFAULT_MIN_KM_DELTA,
+                CONF_SENSOR_GROUPS: list(default_sensor_groups),
+                CONF_FORECAST_MODE: DEFAULT_FORECAST_MODE,
+                CONF_EVENT_HYSTERESIS: DEFAULT_EVENT_HYSTERESIS,
+                **changes,
+            }
+            _validate_lease(data)
+
+        # Namen müssen eindeutig bleiben, auch nach Umbenennungen
+        names: set[str] = set()
+        for data in (
+            *(updates.get(entry_id, entry.data) for entry_id, entry in entries.items()),
+            *new_leases.values(),
+        ):
+            if (name := data[CONF_NAME].lower()) in names:
+                raise ServiceValidationError(
+                    f"More than one lease would be named {data[CONF_NAME]}"
+                )
+            names.add(name)
+
+        # Geänderte Leasings: die Update-Listener übernehmen die Optionen und
+        # die Flotte berechnet alle zusammen in einer Batch-Berechnung neu
+        updated = []
+        for entry_id, data in updates.items():
+            if hass.config_entries.async_update_entry(
+                entries[entry_id], data=data, title=data[CONF_NAME]
+            ):
+                updated.append(entry_id)
+
+        # Neue Leasings
+        results = await asyncio.gather(
+            *(
+                hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": SOURCE_IMPORT}, data=data
+                )
+                for data in new_leases.values()
+            )
+        )
+        created = []
+        not_created = []
+        for data, result in zip(new_leases.values(), results):
+            if result["type"] == FlowResultType.CREATE_ENTRY:
+                created.append(result["result"].entry_id)
+            else:
+                _LOGGER.warning(
+                    "Lease %s was not created: %s",
+                    data[CONF_NAME],
+                    result.get("reason"),
+                )
+                not_created.append(
+                    {"name": data[CONF_NAME], "reason": result.get("reason")}
+                )
+
+        return {"created": created, "updated": updated, "not_created": not_created}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_UPDATE,
+        async_bulk_update,
+        schema=BULK_UPDATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_import_history(call: ServiceCall) -> ServiceResponse:
+        """Import daily odometer readings from a CSV file.
+
+        The file is read row by row in an executor, so even files with
+        millions of rows neither block the event loop nor are loaded into
+        memory at once. The readings are added to the history of the leases
+        before their first stored day, and the imported leases are
+        recalculated together in one batch.
+        """
+        path = call.data[ATTR_FILE_PATH]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(
+                f"Access to {path} is not allowed, add its directory to"
+                " allowlist_external_dirs"
+            )
+
+        coordinators: dict[str, LeasingTrackerCoordinator] = hass.data[DOMAIN]
+        default_lease = call.data.get(ATTR_ENTRY_ID)
+        if default_lease is not None and default_lease not in coordinators:
+            raise ServiceValidationError(f"Unknown lease entry {default_lease}")
+        # Leasings in der Datei per Entry-ID oder Name
+        leases = {
+            key.lower(): entry_id
+            for entry_id, coordinator in coordinators.items()
+            for key in (entry_id, coordinator.config[CONF_NAME])
+        }
+
+        try:
+            result = await hass.async_add_executor_job(
+                partial(
+                    read_csv_history,
+                    path,
+                    date_column=call.data[ATTR_DATE_COLUMN],
+                    km_column=call.data[ATTR_KM_COLUMN],
+                    lease_column=call.data[ATTR_LEASE_COLUMN],
+                    leases=leases,
+                    default_lease=default_lease,
+                    date_format=call.data.get(ATTR_DATE_FORMAT),
+                    delimiter=call.data[ATTR_DELIMITER],
+                    time_zone=dt_util.now().tzinfo,
+                )
+            )
+        except (OSError, UnicodeDecodeError, csv.Error, HistoryImportError) as err:
+            raise ServiceValidationError(f"Cannot import {path}: {err}") from err
+
+        fleet = hass.data[DATA_FLEET]
+        imported: dict[str, dict[str, int]] = {}
+        for entry_id in result.days:
+            if (coordinator := coordinators.get(entry_id)) is None:
+                # Während des Imports entfernt
+                continue
+            readings = result.readings(entry_id)
+            days, rejected = coordinator.async_import_history(readings)
+            result.non_monotonic_days += rejected
+            imported[entry_id] = {"readings": len(readings), "days_added": days}
+            if days:
+                fleet.async_schedule_refresh(coordinator)
+
+        _LOGGER.info(
+            "Imported %s rows from %s: %s", result.rows, path, result.as_dict()
+        )
+        return {**result.as_dict(), "leases": imported}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_simulate(call: ServiceCall) -> ServiceResponse:
+        """Calculate what-if scenarios of changed contract parameters.
+
+        All scenarios are calculated together in one batch from the last KM
+        reading of their lease. The config entries are not changed.
+        """
+        coordinators: dict[str, LeasingTrackerCoordinator] = hass.data[DOMAIN]
+        by_name = {
+            coordinator.config[CONF_NAME].lower(): coordinator
+            for coordinator in coordinators.values()
+        }
+        today = start_of_today()
+
+        scenarios: list[dict[str, Any]] = []
+        inputs = []
+        for scenario in call.data[ATTR_SCENARIOS]:
+            if ATTR_ENTRY_ID in scenario:
+                coordinator = coordinators.get(scenario[ATTR_ENTRY_ID])
+            else:
+                coordinator = by_name.get(scenario[CONF_NAME].lower())
+            if coordinator is None:
+                lease = scenario.get(ATTR_ENTRY_ID) or scenario[CONF_NAME]
+                raise ServiceValidationError(f"Unknown lease {lease}")
+
+            changes = {
+                key: scenario[key] for key in SCENARIO_PARAMETERS if key in scenario
+            }
+            config = {**coordinator.config, **changes}
+            params = LeaseParameters.from_config(config)
+            if params.end_date <= params.start_date:
+                raise ServiceValidationError(
+                    f"End date of a scenario of {config[CONF_NAME]} must be after"
+                    " the start date"
+                )
+
+            result: dict[str, Any] = {
+                ATTR_ENTRY_ID: coordinator.entry_id,
+                CONF_NAME: config[CONF_NAME],
+                CONF_START_DATE: params.start_date.date().isoformat(),
+                CONF_END_DATE: params.end_date.date().isoformat(),
+                CONF_START_KM: params.start_km,
+                CONF_KM_PER_YEAR: params.km_per_year,
+                "values": None,
+            }
+            if ATTR_LABEL in scenario:
+                result[ATTR_LABEL] = scenario[ATTR_LABEL]
+            scenarios.append(result)
+            # Ohne KM-Stand bleibt das Szenario ohne Werte
+            inputs.append(coordinator.scenario_input(params, today))
+
+        calculated = [
+            (result, scenario_input)
+            for result, scenario_input in zip(scenarios, inputs)
+            if scenario_input is not None
+        ]
+        if calculated:
+            leases, current_km, km_at_year_start, km_at_month_start = zip(
+                *(scenario_input for _, scenario_input in calculated)
+            )
+            for (result, _), values in zip(
+                calculated,
+                calculate_batch(
+                    leases, today, current_km, km_at_year_start, km_at_month_start
+                ),
+            ):
+                result["values"] = {**values, **_projected_end(values)}
+
+        return {ATTR_SCENARIOS: scenarios}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SIMULATE,
+        async_simulate,
+        schema=SIMULATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _projected_end(values: dict[str, Any]) -> dict[str, int]:
+    """Project the KM at the end of the lease from the average per day."""
+    projected_km = int(
+        values["total_km_driven"]
+        + values["km_per_day_average"] * values["remaining_days"]
+    )
+    return {
+        "projected_km_end": projected_km,
+        "projected_overage": max(0, projected_km - values["allowed_km_total"]),
+    }
+
+
+def _validate_lease(data: dict[str, Any]) -> None:
+    """Check a lease definition like the config flow does."""
+    if date.fromisoformat(data[CONF_END_DATE]) <= date.fromisoformat(
+        data[CONF_START_DATE]
+    ):
+        raise ServiceValidationError(
+            f"End date of lease {data[CONF_NAME]} must be after the start date"
+        )
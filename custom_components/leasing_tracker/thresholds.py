@@ -0,0 +1,140 @@
+"""Edge-triggered threshold crossings for Leasing Tracker.
+
+Like ``calculation``, this module only uses the standard library and has no
+imports from the integration.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+TRIGGER_STATUS = "status"
+TRIGGER_KM_DIFFERENCE = "km_difference"
+TRIGGER_REMAINING_KM_MONTH = "remaining_km_month_actual"
+
+ZONE_BELOW = "below"
+ZONE_ABOVE = "above"
+
+# Status aufsteigend nach KM-Differenz
+STATUS_ZONES = ("below_plan", "on_track", "above_plan", "far_above_plan")
+THRESHOLD_ZONES = (ZONE_BELOW, ZONE_ABOVE)
+
+
+def zone_index(
+    boundaries: Sequence[float],
+    rising: Sequence[bool],
+    value: float,
+    current: int | None,
+    hysteresis: float,
+) -> int:
+    """Return the zone of a value, like a Schmitt trigger per boundary.
+
+    Zone ``i`` covers the values up to and including ``boundaries[i]``. A
+    boundary is crossed in its direction (upwards if ``rising``, else
+    downwards) as soon as the value is beyond it, and back only once the
+    value is beyond it by more than the hysteresis.
+    """
+    zone = 0
+    for index, (boundary, up) in enumerate(zip(boundaries, rising)):
+        if current is not None:
+            if up and current > index:
+                boundary -= hysteresis
+            elif not up and current <= index:
+                boundary += hysteresis
+        if value > boundary:
+            zone += 1
+    return zone
+
+
+class ThresholdTracker:
+    """Detect transitions of the status and the KM budgets of a lease.
+
+    Watched are the status, and, if configured, the KM difference and the
+    remaining KM this month crossing a threshold. The first values only set
+    the zones, afterwards every change of a zone is reported once.
+
+    A status further away from the plan and a crossed threshold (KM
+    difference above, remaining KM below it) are reported right away, at
+    the same boundaries as the status sensor. Going back is reported only
+    once the value is beyond the boundary by more than the hysteresis.
+    """
+
+    __slots__ = (
+        "hysteresis",
+        "km_difference_threshold",
+        "month_budget_threshold",
+        "_zones",
+    )
+
+    def __init__(
+        self,
+        hysteresis: float,
+        km_difference_threshold: float | None = None,
+        month_budget_threshold: float | None = None,
+    ) -> None:
+        """Initialize the tracker."""
+        self.hysteresis = hysteresis
+        self.km_difference_threshold = km_difference_threshold
+        self.month_budget_threshold = month_budget_threshold
+        self._zones: dict[str, int] = {}
+
+    def update(self, values: Mapping[str, Any]) -> list[dict[str, Any]]:
+        """Take over new values and return the crossings since the last ones."""
+        allowed_per_month = values["allowed_km_per_month"]
+        km_difference = values["km_difference"]
+        crossings = []
+
+        if crossing := self._check(
+            TRIGGER_STATUS,
+            STATUS_ZONES,
+            (-allowed_per_month, 0, allowed_per_month),
+            # Weg vom Plan sofort, zurück zum Plan mit Hysterese
+            (False, True, True),
+            km_difference,
+        ):
+            crossings.append(crossing)
+
+        for trigger, threshold, rising, value in (
+            (
+                TRIGGER_KM_DIFFERENCE,
+                self.km_difference_threshold,
+                True,
+                km_difference,
+            ),
+            (
+                TRIGGER_REMAINING_KM_MONTH,
+                self.month_budget_threshold,
+                False,
+                values["remaining_km_month_actual"],
+            ),
+        ):
+            if threshold is None:
+                continue
+            if crossing := self._check(
+                trigger, THRESHOLD_ZONES, (threshold,), (rising,), value
+            ):
+                crossing["threshold"] = threshold
+                crossings.append(crossing)
+
+        return crossings
+
+    def _check(
+        self,
+        trigger: str,
+        zones: Sequence[str],
+        boundaries: Sequence[float],
+        rising: Sequence[bool],
+        value: float,
+    ) -> dict[str, Any] | None:
+        """Update the zone of a value and return the crossing, if any."""
+        current = self._zones.get(trigger)
+        index = zone_index(boundaries, rising, value, current, self.hysteresis)
+        self._zones[trigger] = index
+        if current is None or index == current:
+            return None
+        return {
+            "trigger": trigger,
+            "from": zones[current],
+            "to": zones[index],
+            "value": value,
+        }
@@ -0,0 +1,12 @@
+"""Test setup: the standard library modules are imported on their own.
+
+Like the standalone use of ``calculation`` described in the README, the
+integration directory is put on the path, so the tests do not need Home
+Assistant.
+"""
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+INTEGRATION = ROOT / "custom_components" / "leasing_tracker"
+sys.path.insert(0, str(INTEGRATION))
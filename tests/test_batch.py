@@ -0,0 +1,58 @@
+"""Tests for the batch calculation."""
+from datetime import datetime
+
+import pytest
+
+import batch
+from batch import calculate_batch
+from calculation import LeaseParameters, calculate_dates, calculate_values
+
+LEASES = [
+    LeaseParameters.from_config(
+        {
+            "start_date": start,
+            "end_date": end,
+            "start_km": start_km,
+            "km_per_year": km_per_year,
+        }
+    )
+    for start, end, start_km, km_per_year in (
+        ("2024-03-15", "2027-03-14", 10, 15000),
+        ("2026-01-01", "2028-12-31", 0, 10000),
+        ("2026-10-18", "2029-10-17", 5, 20000),
+        ("2026-12-01", "2029-11-30", 0, 12000),
+    )
+]
+CURRENT_KM = [40000.0, 9000.0, 5.0, 0.0]
+KM_AT_YEAR_START = [31000.0, None, None, None]
+KM_AT_MONTH_START = [None, 8100.0, None, None]
+
+
+@pytest.mark.parametrize("numpy", [True, False], ids=["numpy", "per_lease"])
+@pytest.mark.parametrize(
+    "today", [datetime(2026, 10, 18), datetime(2026, 12, 31)], ids=str
+)
+def test_batch_matches_single_calculation(
+    monkeypatch: pytest.MonkeyPatch, numpy: bool, today: datetime
+) -> None:
+    """Both batch paths return the values of ``calculate_values``."""
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(batch, "np", None)
+
+    expected = [
+        calculate_values(
+            params, calculate_dates(params, today), km, year_km, month_km
+        )
+        for params, km, year_km, month_km in zip(
+            LEASES, CURRENT_KM, KM_AT_YEAR_START, KM_AT_MONTH_START
+        )
+    ]
+
+    assert (
+        calculate_batch(
+            LEASES, today, CURRENT_KM, KM_AT_YEAR_START, KM_AT_MONTH_START
+        )
+        == expected
+    )
@@ -0,0 +1,82 @@
+"""Tests for the streaming usage estimators."""
+from collections.abc import Callable
+from datetime import date, timedelta
+
+import pytest
+
+from estimators import UsageEstimator
+
+CHANGE = date(2026, 3, 2)
+
+
+def weekly_pattern(day: date) -> float:
+    """Return the distance of a steady week: 80 km on weekdays, 10 km else."""
+    return 80.0 if day.weekday() < 5 else 10.0
+
+
+def estimate(
+    distance: Callable[[date], float], start: date, end: date
+) -> UsageEstimator:
+    """Feed the estimator day by day, as the coordinator does."""
+    closings: dict[date, float] = {}
+    km = 0.0
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        day = date.fromordinal(ordinal)
+        km += distance(day)
+        closings[day] = km
+
+    class Readings:
+        closing = staticmethod(closings.get)
+
+    estimator = UsageEstimator()
+    for ordinal in range(start.toordinal() + 1, end.toordinal() + 1):
+        estimator.update(Readings(), date.fromordinal(ordinal))
+    return estimator
+
+
+def expected(distance: Callable[[date], float], end: date, days: int) -> float:
+    """Return the true distance of the days after the end."""
+    return sum(distance(end + timedelta(days=ahead)) for ahead in range(1, days + 1))
+
+
+@pytest.mark.parametrize("offset", range(7))
+def test_steady_weekly_pattern(offset: int) -> None:
+    """A steady weekly pattern has no trend and is forecast exactly."""
+    end = date(2026, 1, 5) + timedelta(days=offset)
+    estimator = estimate(weekly_pattern, end - timedelta(days=120), end)
+
+    assert estimator.slope == pytest.approx(0, abs=1e-6)
+    assert estimator.forecast(end, 30) == pytest.approx(
+        expected(weekly_pattern, end, 30), rel=1e-3
+    )
+
+
+@pytest.mark.parametrize("factor", [2.0, 0.5])
+def test_regime_change(factor: float) -> None:
+    """After a change of the usage the forecast follows within weeks."""
+
+    def distance(day: date) -> float:
+        return weekly_pattern(day) * (factor if day >= CHANGE else 1)
+
+    start = CHANGE - timedelta(days=120)
+    before = expected(weekly_pattern, CHANGE, 30)
+
+    # Nach einer Woche schon in Richtung des neuen Niveaus
+    end = CHANGE + timedelta(days=6)
+    forecast = estimate(distance, start, end).forecast(end, 30)
+    assert (forecast - before) * (factor - 1) > 0
+
+    # Nach vier Wochen nahe am neuen Niveau
+    end = CHANGE + timedelta(days=27)
+    forecast = estimate(distance, start, end).forecast(end, 30)
+    assert forecast == pytest.approx(expected(distance, end, 30), rel=0.1)
+
+
+def test_stored_estimator_of_another_version_starts_over() -> None:
+    """Estimators stored by an older version are rebuilt."""
+    end = date(2026, 1, 5)
+    data = estimate(weekly_pattern, end - timedelta(days=60), end).as_dict()
+
+    assert UsageEstimator.from_dict(data).as_dict() == data
+    del data["version"]
+    assert UsageEstimator.from_dict(data).days == 0
@@ -0,0 +1,144 @@
+"""Tests for the threshold crossings."""
+from thresholds import ThresholdTracker
+
+ALLOWED_PER_MONTH = 1250
+
+
+def values(km_difference: float, remaining_month: float = 500) -> dict:
+    """Return calculated values with the status of the KM difference."""
+    if km_difference > ALLOWED_PER_MONTH:
+        status = "far_above_plan"
+    elif km_difference > 0:
+        status = "above_plan"
+    elif km_difference > -ALLOWED_PER_MONTH:
+        status = "on_track"
+    else:
+        status = "below_plan"
+    return {
+        "allowed_km_per_month": ALLOWED_PER_MONTH,
+        "km_difference": km_difference,
+        "remaining_km_month_actual": remaining_month,
+        "status": status,
+    }
+
+
+def transitions(tracker: ThresholdTracker, trigger: str, readings) -> list:
+    """Return the reported zone changes of a trigger for a series of values."""
+    return [
+        [
+            (crossing["from"], crossing["to"])
+            for crossing in tracker.update(value)
+            if crossing["trigger"] == trigger
+        ]
+        for value in readings
+    ]
+
+
+def test_status_fires_with_the_status_change() -> None:
+    """A new status is reported as soon as the status changes."""
+    tracker = ThresholdTracker(hysteresis=50)
+    assert transitions(
+        tracker, "status", [values(1000), values(1250), values(1260), values(1300)]
+    ) == [[], [], [("above_plan", "far_above_plan")], []]
+
+
+def test_status_goes_back_only_beyond_the_hysteresis() -> None:
+    """Hovering around a boundary does not fire repeatedly."""
+    tracker = ThresholdTracker(hysteresis=50)
+    assert transitions(
+        tracker,
+        "status",
+        [values(1000), values(1260), values(1240), values(1201), values(1200)],
+    ) == [
+        [],
+        [("above_plan", "far_above_plan")],
+        [],
+        [],
+        [("far_above_plan", "above_plan")],
+    ]
+    # Wieder über der Grenze: sofort, ohne Hysterese
+    assert transitions(tracker, "status", [values(1251)]) == [
+        [("above_plan", "far_above_plan")]
+    ]
+
+
+def test_status_jumps_over_several_zones() -> None:
+    """A large change reports the new status directly."""
+    tracker = ThresholdTracker(hysteresis=50)
+    assert transitions(tracker, "status", [values(1300), values(-1300)]) == [
+        [],
+        [("far_above_plan", "below_plan")],
+    ]
+
+
+def test_threshold_fires_at_the_threshold() -> None:
+    """A threshold fires when crossed and again only beyond the hysteresis."""
+    tracker = ThresholdTracker(hysteresis=50, month_budget_threshold=100)
+    crossings = transitions(
+        tracker,
+        "remaining_km_month_actual",
+        [
+            values(0, remaining)
+            for remaining in (300, 101, 100, 120, 150, 151, 120, 99)
+        ],
+    )
+    assert crossings == [
+        [],
+        [],
+        [("above", "below")],
+        [],
+        [],
+        [("below", "above")],
+        [],
+        [("above", "below")],
+    ]
+
+
+def test_first_values_only_set_the_zones() -> None:
+    """Nothing is reported for the first values."""
+    tracker = ThresholdTracker(
+        hysteresis=50, km_difference_threshold=500, month_budget_threshold=100
+    )
+    assert tracker.update(values(2000, 0)) == []
+
+
+def test_status_below_plan_mirrors_above_plan() -> None:
+    """Below the plan, going further away fires right away as well."""
+    tracker = ThresholdTracker(hysteresis=50)
+    assert transitions(
+        tracker,
+        "status",
+        [values(-1000), values(-1260), values(-1230), values(-1200), values(-1199)],
+    ) == [[], [("on_track", "below_plan")], [], [], [("below_plan", "on_track")]]
+
+
+def test_moving_away_from_the_plan_follows_the_status_sensor() -> None:
+    """Every status change away from the plan is reported with that status."""
+    for readings in ((0, 1, 1250, 1251, 5000), (0, -1250, -1251, -5000)):
+        tracker = ThresholdTracker(hysteresis=50)
+        previous = values(readings[0])["status"]
+        tracker.update(values(readings[0]))
+        for km_difference in readings[1:]:
+            status = values(km_difference)["status"]
+            expected = [] if status == previous else [(previous, status)]
+            assert transitions(tracker, "status", [values(km_difference)]) == [
+                expected
+            ]
+            previous = status
+
+
+def test_km_difference_threshold_fires_above_the_threshold() -> None:
+    """The KM difference threshold fires above it, back below the hysteresis."""
+    tracker = ThresholdTracker(hysteresis=50, km_difference_threshold=500)
+    assert transitions(
+        tracker,
+        "km_difference",
+        [values(km) for km in (400, 500, 501, 460, 450, 501)],
+    ) == [
+        [],
+        [],
+        [("below", "above")],
+        [],
+        [("above", "below")],
+        [("below", "above")],
+    ]